@@ -0,0 +1,204 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is reported as None
+    resource = None
+
+from core.actions import Action, ROLLS
+from core.component.player import Player
+from core.controller.expectiminimax import Expectiminimax
+from core.results import Result
+from core.selfplay import play_game
+from core.states import SenetState, create_initial_state
+
+CORPUS = "benchmarks/positions.json"
+DEPTHS = (1, 2, 3, 4, 5)
+THRESHOLD = 0.10
+MEMORY_DEPTH = 3
+
+# Per depth: metric -> True when higher is better. Node counts do not depend
+# on the machine, so they catch search changes exactly; the timings need the
+# threshold to absorb noise.
+COMPARED = {
+    "nodes": False,
+    "nodes_per_sec": True,
+    "latency_p50_ms": False,
+    "latency_p90_ms": False,
+}
+
+
+def load_corpus(path: str = CORPUS) -> list[SenetState]:
+    with open(path) as f:
+        positions = json.load(f)["positions"]
+    return [SenetState(white=p["white"], black=p["black"], current_player=Player(p["player"]),
+                       white_goal_count=p["white_goals"], black_goal_count=p["black_goals"])
+            for p in positions]
+
+
+def generate_corpus(path: str = CORPUS, games: int = 6, samples: int = 6) -> int:
+    # `samples` evenly spaced positions from each of a few depth-1 self-play
+    # games, so the corpus covers openings, middle games and endings with few pieces.
+    result = Result()
+    positions = []
+    for seed in range(games):
+        game = play_game(seed, white_depth=1, black_depth=1)
+        state = create_initial_state()
+        state.current_player = Player(game["first"])
+        sampled = {game["plies"] * i // samples for i in range(samples)}
+        for ply, (_, from_idx, to_idx, _, _) in enumerate(game["moves"]):
+            if ply in sampled:
+                positions.append({
+                    "seed": seed, "ply": ply,
+                    "white": state.white, "black": state.black, "player": state.current_player.value,
+                    "white_goals": state.white_goal_count, "black_goals": state.black_goal_count,
+                })
+            result.apply(state, (from_idx, to_idx) if from_idx >= 0 else None)
+
+    with open(path, "w") as f:
+        json.dump({"positions": positions}, f, indent=1)
+        f.write("\n")
+    return len(positions)
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def bench_depth(positions: list[SenetState], depth: int, move_ordering: bool = True) -> dict:
+    # Every position and roll with at least one legal move is searched from an
+    # empty transposition table, so the numbers do not depend on the order.
+    engine = Expectiminimax(max_depth=depth, verbose=False, move_ordering=move_ordering)
+    actions = Action()
+    latencies = []
+    totals = {"nodes": 0, "tt_probes": 0, "tt_hits": 0, "alpha_beta_cutoffs": 0,
+              "first_move_cutoffs": 0, "star1_cutoffs": 0, "star2_cutoffs": 0}
+
+    for state in positions:
+        for roll in ROLLS:
+            if not actions.available_actions(state, roll):
+                continue
+            engine.transposition_table.clear()
+            if engine.ordering is not None:
+                engine.ordering.clear()
+            start = time.perf_counter()
+            engine.choose_move(state, roll)
+            latencies.append(time.perf_counter() - start)
+
+            pruning = engine.pruning_stats()
+            tt = engine.transposition_table.stats()
+            totals["nodes"] += engine.nodes_explored
+            totals["tt_probes"] += tt["probes"]
+            totals["tt_hits"] += tt["hits"]
+            for name in ("alpha_beta_cutoffs", "first_move_cutoffs", "star1_cutoffs", "star2_cutoffs"):
+                totals[name] += pruning[name]
+    engine.close()
+
+    seconds = sum(latencies)
+    latencies.sort()
+    return {
+        "searches": len(latencies),
+        **totals,
+        "seconds": round(seconds, 4),
+        "nodes_per_sec": round(totals["nodes"] / seconds) if seconds else 0,
+        "tt_hit_rate": round(totals["tt_hits"] / totals["tt_probes"], 4) if totals["tt_probes"] else 0.0,
+        "first_move_cutoff_rate": (round(totals["first_move_cutoffs"] / totals["alpha_beta_cutoffs"], 4)
+                                   if totals["alpha_beta_cutoffs"] else 0.0),
+        "latency_p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "latency_p90_ms": round(_percentile(latencies, 0.90) * 1000, 3),
+        "latency_p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "latency_max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+def run(depths=DEPTHS, corpus: str = CORPUS, trace_memory: bool = False, verbose: bool = True,
+        move_ordering: bool = True) -> dict:
+    positions = load_corpus(corpus)
+    report = {"corpus": corpus, "positions": len(positions), "python": sys.version.split()[0], "depths": {}}
+    for depth in depths:
+        report["depths"][str(depth)] = stats = bench_depth(positions, depth, move_ordering)
+        if verbose:
+            print(f"  depth {depth}: {stats['searches']} searches, {stats['nodes']} nodes, "
+                  f"{stats['nodes_per_sec']} nodes/s, TT {stats['tt_hit_rate']:.1%}, "
+                  f"first-move cutoffs {stats['first_move_cutoff_rate']:.1%}, "
+                  f"p50 {stats['latency_p50_ms']:.2f}ms p90 {stats['latency_p90_ms']:.2f}ms "
+                  f"max {stats['latency_max_ms']:.2f}ms")
+
+    if trace_memory:
+        # Tracing slows the search several times over, so it gets a pass of its
+        # own after the timed ones, at a depth that finishes in reasonable time.
+        tracemalloc.start()
+        bench_depth(positions, MEMORY_DEPTH, move_ordering)
+        report["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        report["traced_depth"] = MEMORY_DEPTH
+        tracemalloc.stop()
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report["peak_rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+    else:
+        report["peak_rss_bytes"] = None
+    return report
+
+
+def compare(report: dict, baseline: dict, threshold: float = THRESHOLD) -> list[str]:
+    # Metrics more than `threshold` (a fraction) worse than the baseline, for the depths both runs cover.
+    regressions = []
+    for depth, stats in report["depths"].items():
+        base = baseline["depths"].get(depth)
+        if base is None:
+            continue
+        for metric, higher_is_better in COMPARED.items():
+            old, new = base[metric], stats[metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f"depth {depth} {metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the expectiminimax search on a fixed position corpus.")
+    parser.add_argument("--depths", type=int, nargs="+", default=list(DEPTHS))
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    parser.add_argument("--baseline", default=None, help="JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown, as a fraction")
+    parser.add_argument("--trace-memory", action="store_true", help="also report the tracemalloc peak")
+    parser.add_argument("--no-move-ordering", action="store_true", help="search moves in generation order")
+    parser.add_argument("--generate-corpus", action="store_true", help="rebuild the corpus from self-play and exit")
+    args = parser.parse_args()
+
+    if args.generate_corpus:
+        print(f"Wrote {generate_corpus(args.corpus)} positions to {args.corpus}")
+        return
+
+    report = run(args.depths, args.corpus, args.trace_memory, move_ordering=not args.no_move_ordering)
+    if report["peak_rss_bytes"] is not None:
+        print(f"Peak RSS: {report['peak_rss_bytes'] / 2**20:.1f} MiB")
+    if "traced_peak_bytes" in report:
+        print(f"Traced peak at depth {report['traced_depth']}: {report['traced_peak_bytes'] / 2**20:.1f} MiB")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import copy
+import json
+import pickle
+import random
+import timeit
+import tracemalloc
+
+from core.actions import Action
+from core.component.player import Player
+from core.results import Result
+from core.states import FrozenSenetState, SenetState, create_initial_state
+
+COPIES = 100_000
+NUMBER = 200_000
+CHECK_GAMES = 20
+
+# Per operation: the statement timed, run against a mid-game position.
+OPERATIONS = {
+    "hash": "hash(state)",
+    "eq": "state == other",
+    "key": "state.key",
+    "copy": "state.copy()",
+    "player": "state.current_player == Player.WHITE",
+    "apply_undo": "result.undo(state, result.apply(state, move))",
+    "movegen": "actions.available_actions(state, 2)",
+}
+
+
+def _expect(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def check(games: int = CHECK_GAMES) -> int:
+    # Behaviour the timings rely on, over random games: the incrementally
+    # kept key matches one computed from scratch after every apply and undo,
+    # frozen states refuse changes but copy, pickle and deepcopy, and intern()
+    # shares one instance per position. Returns the number of positions checked.
+    rng = random.Random(0)
+    actions = Action()
+    result = Result()
+    checked = 0
+    for _ in range(games):
+        state = create_initial_state()
+        state.current_player = rng.choice((Player.WHITE, Player.BLACK))
+        while not state.is_terminal():
+            fresh = SenetState.unpack(state.pack())
+            _expect(state.key == fresh.key and hash(state) == hash(fresh), f"stale key after apply: {state!r}")
+            _expect(state == fresh, f"equality differs from a rebuilt state: {state!r}")
+
+            frozen = state.freeze()
+            _expect(type(frozen) is FrozenSenetState and frozen == state and hash(frozen) == hash(state),
+                    "freeze() changed the position")
+            try:
+                frozen.white = 0
+                _expect(False, "a frozen state accepted a change")
+            except AttributeError:
+                pass
+            for original in (state, frozen, state.intern()):
+                for restored in (pickle.loads(pickle.dumps(original)), copy.deepcopy(original)):
+                    _expect(type(restored) is type(original) and restored == state and restored.key == state.key,
+                            f"pickle or deepcopy changed {type(original).__name__}")
+            _expect(type(frozen.copy()) is SenetState, "copy() of a frozen state is not mutable")
+            _expect(state.intern() is fresh.intern(), "equal positions interned as different instances")
+
+            moves = actions.available_actions(state, rng.choice((1, 2, 3, 4, 5)))
+            move = rng.choice(moves) if moves else None
+            undo = result.apply(state, move)
+            before = result.result(fresh, move)
+            _expect(state == before and state.key == before.key, "apply differs from result()")
+            if rng.random() < 0.2:
+                result.undo(state, undo)
+                _expect(state == fresh and state.key == fresh.key, "undo did not restore the key")
+                result.apply(state, move)
+            checked += 1
+    return checked
+
+
+def bytes_per_state(copies: int = COPIES) -> float:
+    state = create_initial_state()
+    tracemalloc.start()
+    kept = [state.copy() for _ in range(copies)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size / copies
+
+
+def run(number: int = NUMBER) -> dict:
+    result = Result()
+    state = create_initial_state()
+    for move in ((12, 14), (13, 15), (10, 11)):
+        result.apply(state, move)
+    names = {"state": state, "other": state.copy(), "result": result, "actions": Action(),
+             "move": (14, 16), "Player": Player}
+
+    report = {"bytes_per_state": round(bytes_per_state(), 1)}
+    for name, statement in OPERATIONS.items():
+        seconds = min(timeit.repeat(statement, globals=names, number=number, repeat=5))
+        report[f"{name}_ns"] = round(seconds / number * 1e9, 1)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memory and speed of the basic SenetState operations.")
+    parser.add_argument("--number", type=int, default=NUMBER, help="calls per timing")
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    parser.add_argument("--skip-check", action="store_true", help="only time, without the behaviour check")
+    args = parser.parse_args()
+
+    if not args.skip_check:
+        print(f"  checked {check()} positions")
+    report = run(args.number)
+    for name, value in report.items():
+        print(f"  {name}: {value}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
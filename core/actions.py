@@ -1,67 +1,97 @@
 from core.component.main_house import *
+from core.component.bitboard import BOARD_SIZE, rebirth_square
 from core.component.player import Player
 
+EXIT = 30
+ROLLS = (1, 2, 3, 4, 5)
+
+
+def _target(from_pos: int, roll: int):
+    # Destination of a piece on `from_pos` for `roll` on an otherwise empty
+    # board: EXIT when it bears off, None when the move is never legal.
+    target_pos = from_pos + roll
+    if from_pos < HOUSE_OF_HAPPINESS < target_pos:
+        return None
+    if target_pos > HOUSE_OF_HORUS:
+        return EXIT if from_pos >= HOUSE_OF_HAPPINESS and target_pos == EXIT else None
+    return target_pos
+
+
+def _mask(squares) -> int:
+    mask = 0
+    for pos in squares:
+        mask |= 1 << pos
+    return mask
+
+
+# Per roll, indexed by square: where the move lands before the House of Water
+# sends it back (None if it would jump over the House of Happiness or overshoot
+# the exit), and the squares whose move stays on the board, exits, or lands in
+# the water.
+TARGETS = {roll: tuple(_target(pos, roll) for pos in range(BOARD_SIZE)) for roll in ROLLS}
+STEP_SOURCES = {roll: _mask(pos for pos, t in enumerate(TARGETS[roll]) if t is not None and t != EXIT) for roll in ROLLS}
+EXIT_SOURCES = {roll: _mask(pos for pos, t in enumerate(TARGETS[roll]) if t == EXIT) for roll in ROLLS}
+WATER_SOURCES = {roll: _mask(pos for pos, t in enumerate(TARGETS[roll]) if t == HOUSE_OF_WATER) for roll in ROLLS}
+
+
 class Action:
     def __init__(self):
         self.from_position = None
         self.steps = None
- 
+
     def _is_empty(self, cell) -> bool:
         return cell == Player.EMPTY.value
- 
-    def available_actions(self, state, roll):
-        legal_moves = []
-        current_player_symbol = state.current_player.value
-        board = state.board
-        
-        for pos in range(len(board)):
-            if board[pos] == current_player_symbol:
-                if self._is_valid_move(state, pos, roll):
-                    target_pos = pos + roll
-                    if target_pos > HOUSE_OF_HORUS:
-                        final_pos = 30 
-                    else:
-                        final_pos = self._apply_special_square_effects(state, target_pos)
-                    
-                    legal_moves.append({pos: final_pos})
-        
-        return legal_moves
 
-    def _is_valid_move(self, state, from_pos, roll):
-        current_player_symbol = state.current_player.value
-        target_pos = from_pos + roll
+    def movable_pieces(self, state, roll) -> int:
+        own = state.black if state.side else state.white
+        return (own & ~(own >> roll) & STEP_SOURCES[roll]) | (own & EXIT_SOURCES[roll])
+
+    def available_actions(self, state, roll) -> tuple:
+        # Flat tuple of (from, to) pairs in board order; `to` is 30 for a piece leaving the board.
+        sources = self.movable_pieces(state, roll)
+        if not sources:
+            return ()
 
-        if from_pos < HOUSE_OF_HAPPINESS < target_pos:
-            return False
+        targets = TARGETS[roll]
+        water = self._water_destination(state) if sources & WATER_SOURCES[roll] else None
+        legal_moves = []
+        while sources:
+            low = sources & -sources
+            pos = low.bit_length() - 1
+            sources ^= low
+            final_pos = targets[pos]
+            if final_pos == HOUSE_OF_WATER:
+                final_pos = water
+            legal_moves.append((pos, final_pos))
+        return tuple(legal_moves)
 
-        if target_pos > HOUSE_OF_HORUS:
-            return self._can_exit_board(from_pos, roll)
+    def iter_actions(self, state, roll):
+        # Lazy variant of available_actions for callers that may stop early.
+        sources = self.movable_pieces(state, roll)
+        targets = TARGETS[roll]
+        while sources:
+            low = sources & -sources
+            pos = low.bit_length() - 1
+            sources ^= low
+            final_pos = targets[pos]
+            if final_pos == HOUSE_OF_WATER:
+                final_pos = self._water_destination(state)
+            yield pos, final_pos
 
-        if target_pos <= HOUSE_OF_HORUS:
-            if state.board[target_pos] == current_player_symbol:
-                return False
+    def _is_valid_move(self, state, from_pos, roll):
+        return bool(self.movable_pieces(state, roll) >> from_pos & 1)
 
-        return True
-    
     def _can_exit_board(self, from_pos, roll):
-        if from_pos >= HOUSE_OF_HAPPINESS:
-            return (from_pos + roll) == 30
-        return False
-    
+        return bool(EXIT_SOURCES[roll] >> from_pos & 1)
+
+    def _water_destination(self, state) -> int:
+        target = rebirth_square(state.white | state.black)
+        return 0 if target is None else target
+
     def _apply_special_square_effects(self, state, pos):
         if pos == HOUSE_OF_WATER:
-            rebirth_idx = HOUSE_OF_REBIRTH 
-            
-            if self._is_empty(state.board[rebirth_idx]):
-                 return rebirth_idx
-            
-            for i in range(rebirth_idx - 1, -1, -1):
-                if self._is_empty(state.board[i]):
-                    return i
-            return 0 
-            
+            return self._water_destination(state)
         return pos
 
     def get_legal_moves(self, state, roll):
-        actions = self.available_actions(state, roll)
-        return [list(a.values())[0] for a in actions]
\ No newline at end of file
+        return [to_idx for _, to_idx in self.available_actions(state, roll)]
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, Optional, TextIO
+
+from core.actions import Action, ROLLS
+from core.component.bitboard import BOARD_SIZE
+from core.component.player import Player
+from core.component.zobrist import MAX_PIECES
+from core.controller import heuristic
+from core.controller.expectiminimax import Expectiminimax
+from core.controller.tablebase import EndgameTablebase
+from core.states import SenetState
+
+CHUNK_SIZE = 16
+BOARD_CHARACTERS = {Player.WHITE.value, Player.BLACK.value, Player.EMPTY.value}
+IN_FLIGHT_PER_WORKER = 4
+
+# One engine per (depth, time limit, tablebase) in each process, kept between
+# chunks so the transposition table stays warm across related positions.
+_engines = {}
+
+
+def _engine(depth: int, time_limit: Optional[float], tablebase_path: Optional[str]) -> Expectiminimax:
+    key = (depth, time_limit, tablebase_path)
+    if key not in _engines:
+        tablebase = EndgameTablebase(tablebase_path) if tablebase_path else None
+        _engines[key] = Expectiminimax(max_depth=depth, verbose=False, time_limit=time_limit,
+                                       tablebase=tablebase)
+    return _engines[key]
+
+
+def parse_state(record: dict) -> SenetState:
+    # Either a 30-character "board" of W, B and . or the bitboard fields used
+    # by the benchmark corpus. "player" is the side to move. Anything that is
+    # not a position raises ValueError, before SenetState indexes its key
+    # tables with it.
+    if not isinstance(record, dict):
+        raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+    player = Player(record.get("player", Player.WHITE.value))
+    goals = {"white_goal_count": record.get("white_goals", 0), "black_goal_count": record.get("black_goals", 0)}
+    for name, count in goals.items():
+        if type(count) is not int or not 0 <= count <= MAX_PIECES:
+            raise ValueError(f"{name} must be an integer from 0 to {MAX_PIECES}, got {count!r}")
+
+    if "board" in record:
+        board = record["board"]
+        if not isinstance(board, str) or len(board) != BOARD_SIZE:
+            raise ValueError(f"board must be a string of {BOARD_SIZE} squares")
+        unknown = set(board) - BOARD_CHARACTERS
+        if unknown:
+            raise ValueError(f"board squares must be W, B or ., got {''.join(sorted(unknown))!r}")
+        state = SenetState.from_board(list(board), current_player=player, **goals)
+    else:
+        white, black = record["white"], record["black"]
+        for mask in (white, black):
+            if type(mask) is not int or not 0 <= mask < 1 << BOARD_SIZE:
+                raise ValueError(f"white and black must be {BOARD_SIZE}-bit masks, got {mask!r}")
+        if white & black:
+            raise ValueError("white and black share a square")
+        state = SenetState(white=white, black=black, current_player=player, **goals)
+
+    if (state.white.bit_count() + state.white_goal_count > MAX_PIECES
+            or state.black.bit_count() + state.black_goal_count > MAX_PIECES):
+        raise ValueError(f"a side has more than {MAX_PIECES} pieces")
+    return state
+
+
+def _parse_roll(roll) -> int:
+    # 2.0 and true compare equal to rolls but are not ones.
+    if type(roll) is not int or roll not in ROLLS:
+        raise ValueError(f"invalid roll {roll!r}")
+    return roll
+
+
+def read_tasks(lines: Iterable[str]) -> Iterator[dict]:
+    # One task per position and roll, read lazily. A record without "roll" is
+    # analysed for every roll that has a legal move. Lines that cannot be
+    # parsed become tasks that only carry the error.
+    actions = Action()
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            state = parse_state(record)
+            rolls = [_parse_roll(record["roll"])] if "roll" in record else [
+                roll for roll in ROLLS if actions.available_actions(state, roll)]
+        except (ValueError, KeyError, TypeError) as e:
+            yield {"line": line_no, "error": f"{type(e).__name__}: {e}"}
+            continue
+        for roll in rolls:
+            yield {"line": line_no, "id": record.get("id"), "state": state.pack(), "roll": roll}
+
+
+def analyze_task(task: dict, depth: int, time_limit: Optional[float] = None,
+                 tablebase_path: Optional[str] = None, weights: Optional[tuple] = None) -> dict:
+    # Anything that goes wrong with one task becomes its error entry, so one
+    # bad line neither stops the run nor loses the rest of its chunk.
+    if "error" in task:
+        return task
+    try:
+        return _analyze(task, depth, time_limit, tablebase_path, weights)
+    except Exception as e:
+        return {"line": task.get("line"), "id": task.get("id"), "error": f"{type(e).__name__}: {e}"}
+
+
+def _analyze(task: dict, depth: int, time_limit: Optional[float], tablebase_path: Optional[str],
+             weights: Optional[tuple]) -> dict:
+    if weights is not None and weights != heuristic.WEIGHTS:
+        heuristic.set_weights(weights)
+    engine = _engine(depth, time_limit, tablebase_path)
+    state = SenetState.unpack(task["state"])
+    roll = _parse_roll(task["roll"])
+
+    start = time.perf_counter()
+    action, value = engine.choose_move(state, roll)
+    stats = engine.last_stats
+    line = engine.principal_variation(state, roll, action, stats.completed_depth) if action else []
+    return {
+        "line": task["line"],
+        "id": task["id"],
+        "roll": roll,
+        "best": list(action) if action else None,
+        "value": round(value, 4),
+        "depth": stats.completed_depth,
+        "pv": [[ply_roll, *(ply_action or (-1, -1))] for ply_roll, ply_action in line],
+        "nodes": stats.nodes,
+        "tt_hits": stats.tt_hits,
+        "cutoffs": [stats.alpha_beta_cutoffs, stats.star1_cutoffs, stats.star2_cutoffs],
+        "source": stats.source,
+        "ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+def _analyze_chunk(tasks: list, depth: int, time_limit: Optional[float],
+                   tablebase_path: Optional[str], weights: Optional[tuple]) -> list:
+    return [analyze_task(task, depth, time_limit, tablebase_path, weights) for task in tasks]
+
+
+def analyze_stream(lines: Iterable[str], depth: int = 3, time_limit: Optional[float] = None,
+                   workers: Optional[int] = None, tablebase_path: Optional[str] = None,
+                   weights: Optional[tuple] = None) -> Iterator[dict]:
+    # Results come out in input order. Input is read only as fast as the
+    # workers free up: at most a few chunks per worker are queued, so memory
+    # stays flat for inputs of any length, and a slow consumer of this
+    # generator stops the reading too.
+    workers = workers or os.cpu_count() or 1
+    settings = (depth, time_limit, tablebase_path, weights)
+    tasks = read_tasks(lines)
+    if workers <= 1:
+        for task in tasks:
+            yield analyze_task(task, *settings)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        while True:
+            while len(pending) < workers * IN_FLIGHT_PER_WORKER:
+                chunk = list(islice(tasks, CHUNK_SIZE))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_analyze_chunk, chunk, *settings))
+            if not pending:
+                break
+            yield from pending.popleft().result()
+
+
+def run(input_stream: TextIO, output: TextIO, depth: int = 3, time_limit: Optional[float] = None,
+        workers: Optional[int] = None, tablebase_path: Optional[str] = None,
+        weights: Optional[tuple] = None) -> dict:
+    summary = {"results": 0, "errors": 0, "nodes": 0}
+    start = time.perf_counter()
+    for result in analyze_stream(input_stream, depth, time_limit, workers, tablebase_path, weights):
+        output.write(json.dumps(result, separators=(",", ":")) + "\n")
+        if "error" in result:
+            summary["errors"] += 1
+        else:
+            summary["results"] += 1
+            summary["nodes"] += result["nodes"]
+    output.flush()
+    summary["seconds"] = time.perf_counter() - start
+    summary["per_sec"] = summary["results"] / summary["seconds"] if summary["seconds"] else 0.0
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Analyse a stream of JSONL positions without the GUI.")
+    parser.add_argument("--input", default="-", help="JSONL file of positions, or - for stdin")
+    parser.add_argument("--output", default="-", help="JSONL file for the results, or - for stdout")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=None, help="seconds per search instead of a fixed depth")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    parser.add_argument("--tablebase", default=None)
+    parser.add_argument("--weights", default=None, help="heuristic weight file from core.tuning")
+    args = parser.parse_args()
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input)
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        weights = heuristic.read_weights(args.weights) if args.weights else None
+        summary = run(input_stream, output, args.depth, args.time_limit, args.workers, args.tablebase, weights)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"Analysed {summary['results']} searches ({summary['errors']} errors) in {summary['seconds']:.1f}s "
+          f"({summary['per_sec']:.1f}/sec, {summary['nodes']} nodes)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from core.component.main_house import HOUSE_OF_REBIRTH
+
+BOARD_SIZE = 30
+FULL_MASK = (1 << BOARD_SIZE) - 1
+REBIRTH_ZONE_MASK = (1 << (HOUSE_OF_REBIRTH + 1)) - 1
+
+
+def iter_bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def rebirth_square(occupied: int) -> int | None:
+    # House of Rebirth if free, otherwise the nearest free square behind it.
+    free = ~occupied & REBIRTH_ZONE_MASK
+    if not free:
+        return None
+    return free.bit_length() - 1
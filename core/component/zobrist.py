@@ -0,0 +1,30 @@
+import random
+
+from core.component.bitboard import BOARD_SIZE
+
+MAX_PIECES = 7
+
+# Fixed seed: keys must match across processes and runs (opening book, saved tables).
+_rng = random.Random(0x5E4E7)
+
+WHITE_SQUARE_KEYS = tuple(_rng.getrandbits(64) for _ in range(BOARD_SIZE))
+BLACK_SQUARE_KEYS = tuple(_rng.getrandbits(64) for _ in range(BOARD_SIZE))
+WHITE_GOAL_KEYS = tuple(_rng.getrandbits(64) for _ in range(MAX_PIECES + 1))
+BLACK_GOAL_KEYS = tuple(_rng.getrandbits(64) for _ in range(MAX_PIECES + 1))
+BLACK_TO_MOVE_KEY = _rng.getrandbits(64)
+MAX_NODE_KEY = _rng.getrandbits(64)
+# Indexed by roll; keys the best move found for a position and a roll.
+ROLL_KEYS = tuple(_rng.getrandbits(64) for _ in range(6))
+
+
+def squares_key(mask: int, keys: tuple) -> int:
+    key = 0
+    while mask:
+        low = mask & -mask
+        key ^= keys[low.bit_length() - 1]
+        mask ^= low
+    return key
+
+
+def position_key(white: int, black: int) -> int:
+    return squares_key(white, WHITE_SQUARE_KEYS) ^ squares_key(black, BLACK_SQUARE_KEYS)
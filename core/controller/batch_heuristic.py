@@ -0,0 +1,91 @@
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the search falls back to Heuristic.evaluate
+    np = None
+
+from core.component.bitboard import BOARD_SIZE
+from core.controller import heuristic
+from core.controller.heuristic import MAX_SCORE, MIN_SCORE
+
+
+_SQUARES = np.arange(BOARD_SIZE, dtype=np.int64) if np is not None else None
+_PAD = 6
+
+
+def available() -> bool:
+    return np is not None
+
+
+def encode(whites, blacks):
+    # (N, 30) int8 boards: +1 white piece, -1 black piece, 0 empty.
+    white_bits = (np.asarray(whites, dtype=np.int64)[:, None] >> _SQUARES) & 1
+    black_bits = (np.asarray(blacks, dtype=np.int64)[:, None] >> _SQUARES) & 1
+    return (white_bits - black_bits).astype(np.int8)
+
+
+def _running_count(pieces):
+    # Column i + 6 holds the number of pieces on squares 0..i; the six leading
+    # zero columns let every window below be a plain slice.
+    counts = np.zeros((len(pieces), BOARD_SIZE + _PAD), dtype=np.int16)
+    np.cumsum(pieces, axis=1, out=counts[:, _PAD:])
+    return counts
+
+
+def _threatened(pieces, opponents_count):
+    # Pieces with an opposing piece one to five squares behind them.
+    window = opponents_count[:, _PAD - 1:-1] - opponents_count[:, :-_PAD]
+    return np.count_nonzero(pieces & (window > 0), axis=1)
+
+
+def features_boards(boards, white_goals, black_goals):
+    # (N, 6) int64 terms of the evaluation, one column per name in
+    # heuristic.WEIGHT_NAMES, so a score is the row times the weights.
+    # Terminal positions are not special-cased here.
+    white = boards == 1
+    black = boards == -1
+    white_count = np.count_nonzero(white, axis=1)
+    black_count = np.count_nonzero(black, axis=1)
+    signed = boards.astype(np.int64)
+
+    features = np.empty((len(boards), len(heuristic.WEIGHT_NAMES)), dtype=np.int64)
+    features[:, 0] = np.asarray(white_goals, dtype=np.int64) - np.asarray(black_goals, dtype=np.int64)
+    features[:, 1] = black_count - white_count
+    # Squares count with a + sign for white and a - sign for black, as the board encodes.
+    features[:, 2] = signed @ _SQUARES
+    features[:, 3] = signed[:, 25] - signed[:, 27:30].sum(axis=1)
+
+    white_running = _running_count(white)
+    black_running = _running_count(black)
+
+    blacks_below = black_running[:, _PAD - 1:-1]
+    pairs_ahead = np.einsum("ij,ij->i", white, blacks_below, dtype=np.int64)
+    features[:, 4] = 2 * pairs_ahead - white_count * black_count
+    features[:, 5] = _threatened(black, white_running) - _threatened(white, black_running)
+    return features
+
+
+def evaluate_boards(boards, white_goals, black_goals):
+    # Heuristic.evaluate for every row of an (N, 30) board array.
+    score = features_boards(boards, white_goals, black_goals) @ np.asarray(heuristic.WEIGHTS, dtype=np.int64)
+    score = np.where(np.any(boards == -1, axis=1), score, MIN_SCORE)
+    score = np.where(np.any(boards == 1, axis=1), score, MAX_SCORE)
+    return score.astype(np.float64)
+
+
+def evaluate_positions(positions):
+    # `positions` is a sequence of (white, black, white_goal_count, black_goal_count).
+    if not positions:
+        return np.zeros(0, dtype=np.float64)
+    whites, blacks, white_goals, black_goals = zip(*positions)
+    return evaluate_boards(encode(whites, blacks), white_goals, black_goals)
+
+
+def evaluate_states(states):
+    return evaluate_positions([(s.white, s.black, s.white_goal_count, s.black_goal_count) for s in states])
+
+
+def features_positions(positions):
+    if not positions:
+        return np.zeros((0, len(heuristic.WEIGHT_NAMES)), dtype=np.int64)
+    whites, blacks, white_goals, black_goals = zip(*positions)
+    return features_boards(encode(whites, blacks), white_goals, black_goals)
@@ -1,165 +1,787 @@
-from typing import Callable, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Callable, Optional, Tuple
 import time
-from core.actions import Action
+from core.actions import Action, ROLLS
 from core.controller.probability import Probability
 from core.results import Result
+from core.component.player import Player
 from core.states import SenetState
-from core.controller.heuristic import Heuristic
+from core.controller import batch_heuristic, heuristic
+from core.controller.heuristic import Heuristic, MAX_SCORE, MIN_SCORE
+from core.controller.move_ordering import MoveOrdering
+from core.controller.search_stats import SearchProfiler, SearchStats
+from core.controller.tablebase import EndgameTablebase
+from core.controller.transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+from core.component.zobrist import MAX_NODE_KEY, ROLL_KEYS
+
+if TYPE_CHECKING:
+    from core.controller.opening_book import OpeningBook
+
+MAX_ITERATIVE_DEPTH = 64
+DEADLINE_CHECK_INTERVAL = 1024
+# Nodes this close to the leaves keep generation order: their children are
+# evaluated directly, and sorting cost more than the cutoffs it bought.
+ORDERING_MIN_DEPTH = 2
+PONDER_WIDTH = 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+_worker_engine = None
+
+
+def _search_root_task(settings: tuple, packed_state: tuple, action: tuple, roll: Optional[int],
+                      depth: int, deadline: Optional[float]) -> tuple:
+    # Runs in a pool process. Searches one root move, or one opponent roll
+    # below it, with a full window so the value is exact whatever the other
+    # tasks find. Each process keeps its engine and transposition table
+    # between tasks.
+    global _worker_engine
+    if _worker_engine is None or _worker_engine._settings() != settings:
+        tt_capacity, star2, batch_leaves, tablebase_path, weights, move_ordering = settings
+        if heuristic.WEIGHTS != weights:
+            heuristic.set_weights(weights)
+        tablebase = EndgameTablebase(tablebase_path) if tablebase_path else None
+        _worker_engine = Expectiminimax(verbose=False, tt_capacity=tt_capacity, star2=star2,
+                                        batch_leaves=batch_leaves, tablebase=tablebase,
+                                        move_ordering=move_ordering)
+    engine = _worker_engine
+    engine._reset_counters()
+
+    state = SenetState.unpack(packed_state)
+    is_max_child = state.current_player != Player.WHITE
+    engine.result.apply(state, action)
+    engine._set_deadline(deadline)
+    try:
+        if roll is None:
+            value = engine._expectiminimax(state, depth - 1, is_max_child, float('-inf'), float('inf'))
+        else:
+            value = engine._roll_value(state, roll, depth - 1, is_max_child, float('-inf'), float('inf'))
+    except SearchTimeout:
+        value = None
+    finally:
+        engine._set_deadline(None)
+    return value, engine._counters()
+
 
 class Expectiminimax:
     
     def __init__(self, ui_callback: Optional[Callable[[], None]] = None, 
-                 max_depth: int = 3, verbose: bool = True):
+                 max_depth: int = 3, verbose: bool = True, tt_capacity: int = 1 << 18,
+                 star2: bool = True, time_limit: Optional[float] = None, workers: int = 0,
+                 split_rolls: bool = False, batch_leaves: bool = False,
+                 tablebase: Optional[EndgameTablebase] = None,
+                 opening_book: Optional["OpeningBook"] = None,
+                 profile: bool = False, move_ordering: bool = True,
+                 stats_callback: Optional[Callable[[SearchStats], None]] = None):
         self.probability = Probability()
         self.actions = Action()
         self.result = Result()
         self.ui_callback = ui_callback
         self.max_depth = max_depth
+        self.time_limit = time_limit
         self.verbose = verbose
         self.nodes_explored = 0
         self.pruned_nodes = 0
+        self.star2 = star2
+        self.star1_cutoffs = 0
+        self.star2_cutoffs = 0
+        self.star2_probes = 0
+        # Alpha-beta cutoffs by the first move searched at a MAX/MIN node. Where
+        # Star2 probed that node, it is the second move: the first was probed
+        # already, and its value became the node's alpha, so it can no longer cut.
+        self.first_move_cutoffs = 0
         
-        self.transposition_table = {}
+        self.transposition_table = TranspositionTable(tt_capacity)
         self.tt_hits = 0
-        
+        self.completed_depth = 0
+        self._deadline: Optional[float] = None
+        self._next_deadline_check = float('inf')
+        # cancel() bumps the generation; a search is cancelled once it differs
+        # from the one the search started with (see _begin).
+        self.generation = 0
+        self._search_generation = 0
 
-    def choose_move(self, state: SenetState, roll: int) -> Tuple[Optional[tuple], float]:
+        # Evaluating the last ply per chance node in one NumPy call needs numpy.
+        self.batch_leaves = batch_leaves and batch_heuristic.available()
 
-        self.nodes_explored = 0
-        self.pruned_nodes = 0
-        self.tt_hits = 0
-        self.transposition_table.clear()
+        self.tablebase = tablebase
+        self.opening_book = opening_book
 
-        start_time = time.time()
+        # Hash move, killers, history and static scores decide the order moves
+        # are tried in below the root; the root keeps generation order (or the
+        # previous iteration's best first) so ties resolve the same way.
+        self.ordering = MoveOrdering() if move_ordering else None
 
-        if self.verbose:
-            print("\n" + "="*60)
-            print(f"EXPECTIMINIMAX: Roll={roll}, Depth={self.max_depth}")
-            print("="*60)
+        self.workers = workers
+        self.split_rolls = split_rolls
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        # Every choose_move leaves a SearchStats in last_stats and passes it to
+        # stats_callback. Per-ply and per-phase detail needs profile=True.
+        self._evaluate = Heuristic.evaluate
+        self._evaluate_positions = batch_heuristic.evaluate_positions
+        self._root_depth = 0
+        self._root_values: list = []
+        self.last_stats: Optional[SearchStats] = None
+        self.stats_callback = stats_callback
+        self.profiler = SearchProfiler() if profile else None
+        if self.profiler is not None:
+            self.profiler.install(self)
+
+        # (state key, roll) -> (action, value, depth), filled by ponder().
+        self._replies: dict = {}
+        self._weights = heuristic.WEIGHTS
+        
+
+    def choose_move(self, state: SenetState, roll: int, time_limit: Optional[float] = None,
+                    generation: Optional[int] = None) -> Tuple[Optional[tuple], float]:
+        # Read once, as in ponder.
+        depth = self.max_depth
+        self._begin(generation)
+        self._sync_weights()
+        self._reset_counters()
+        self._new_search()
+        self._set_deadline(None)
+        self.completed_depth = 0
+        self.transposition_table.reset_stats()
+        if self.profiler is not None:
+            self.profiler.reset()
+        if time_limit is None:
+            time_limit = self.time_limit
+
+        stats = SearchStats(roll=roll, max_depth=depth, time_limit=time_limit)
+        self.last_stats = stats
+        self._root_values = []
+        start_time = time.time()
         
         legal_moves = self.actions.available_actions(state, roll)
         
-        if not legal_moves:
-            return None, Heuristic.evaluate(state)
+        # Book moves were searched offline; use them unless a deeper search was asked for.
+        entry = None
+        if legal_moves and self.opening_book is not None and (
+                time_limit is not None or self.opening_book.depth >= depth):
+            entry = self.opening_book.lookup(state, roll)
+        reply = self._replies.get((state.key, roll)) if legal_moves and entry is None else None
+        if reply is not None and reply[2] < depth and time_limit is None:
+            reply = None
         
+        if not legal_moves:
+            stats.source = "no moves"
+            best_action, best_value = None, self._evaluate(state)
+        elif entry is not None:
+            stats.source = "book"
+            best_action, best_value = entry
+            self.completed_depth = self.opening_book.depth
+        elif reply is not None:
+            stats.source = "ponder"
+            best_action, best_value, self.completed_depth = reply
+        else:
+            state = state.copy()
+            if time_limit is None:
+                best_action, best_value = self._search_root(state, legal_moves, depth)
+                self.completed_depth = depth
+                stats.iterations.append((depth, best_action, best_value, self.nodes_explored,
+                                         time.time() - start_time))
+            else:
+                best_action, best_value = self._iterative_deepening(state, legal_moves, start_time + time_limit)
+
+        stats.best_action = best_action
+        stats.value = best_value
+        stats.root_moves = self._root_values
+        self._finish_stats(stats, start_time)
+        return best_action, best_value
+
+    def _finish_stats(self, stats: SearchStats, start_time: float) -> None:
+        stats.completed_depth = self.completed_depth
+        stats.elapsed = time.time() - start_time
+        stats.nodes = self.nodes_explored
+        stats.tt_hits = self.tt_hits
+        stats.alpha_beta_cutoffs = self.pruned_nodes
+        stats.first_move_cutoffs = self.first_move_cutoffs
+        stats.star1_cutoffs = self.star1_cutoffs
+        stats.star2_cutoffs = self.star2_cutoffs
+        stats.star2_probes = self.star2_probes
+        stats.tt = self.transposition_table.stats()
+        if self.profiler is not None:
+            self.profiler.fill(stats)
+
+        if self.verbose:
+            print("\n" + stats.report() + "\n")
+        if self.stats_callback is not None:
+            self.stats_callback(stats)
+
+    def choose_moves_all_rolls(self, state: SenetState) -> Tuple[dict, float]:
+        # Best move and value for every roll of `state` at max_depth, in one call
+        # sharing the transposition table, and their expectation over the stick
+        # throw. Roll -> (action, value); the action is None when the roll
+        # forces a pass. The answers also go into the reply cache, so a
+        # choose_move for the roll thrown afterwards returns at once.
+        depth = self.max_depth
+        self._begin(None)
+        self._sync_weights()
+        self._reset_counters()
+        self._new_search()
+        self._set_deadline(None)
+        self.completed_depth = 0
+        self.transposition_table.reset_stats()
+        if self.profiler is not None:
+            self.profiler.reset()
+        state = state.copy()
+        maximize = state.current_player == Player.WHITE
+        stats = SearchStats(roll=None, max_depth=depth, source="all rolls")
+        self.last_stats = stats
+        self._root_values = []
+        start_time = time.time()
+
+        replies = {}
+        for roll in sorted(ROLLS, key=self.probability.get_probability, reverse=True):
+            legal_moves = self.actions.available_actions(state, roll)
+            if legal_moves:
+                action, value = self._search_root(state, legal_moves, depth)
+                self._replies[(state.key, roll)] = (action, value, depth)
+            else:
+                self._root_depth = depth
+                undo = self.result.apply(state, None)
+                try:
+                    value = self._expectiminimax(state, depth - 1, not maximize, float('-inf'), float('inf'))
+                finally:
+                    self.result.undo(state, undo)
+                action = None
+            replies[roll] = (action, value)
+
+        replies = {roll: replies[roll] for roll in ROLLS}
+        expected = sum(self.probability.get_probability(roll) * replies[roll][1] for roll in ROLLS)
+        self.completed_depth = depth
+        stats.replies = replies
+        stats.value = expected
+        self._finish_stats(stats, start_time)
+        return replies, expected
+
+    def ponder(self, state: SenetState, width: int = PONDER_WIDTH, generation: Optional[int] = None) -> int:
+        # Called while the opponent is to move in `state`. For each opponent
+        # roll, its `width` best moves by a one-ply search are played, and each
+        # resulting position is searched to max_depth for all of our rolls.
+        # The most probable opponent rolls go first. The answers go to a reply
+        # cache that choose_move uses, and the searches fill the transposition
+        # table. cancel() stops pondering early; the replies finished so far are
+        # kept. Returns the number of cached replies. max_depth is read once:
+        # the UI may change it while this runs.
+        depth = self.max_depth
+        self._begin(generation)
+        self._sync_weights()
+        self._replies = {}
+        self._reset_counters()
+        self._new_search()
+        self._set_deadline(None)
+        state = state.copy()
+        opponent_maximizes = state.current_player == Player.WHITE
+
+        positions = {}
+        try:
+            for roll in sorted(ROLLS, key=self.probability.get_probability, reverse=True):
+                legal_moves = self.actions.available_actions(state, roll)
+                if legal_moves:
+                    self._search_root(state, legal_moves, 1)
+                    ranked = sorted(self._root_values, key=lambda entry: entry[1], reverse=opponent_maximizes)
+                    likely = [action for action, _ in ranked[:width]]
+                else:
+                    likely = [None]
+                for action in likely:
+                    child = self.result.result(state, action)
+                    if not child.is_terminal():
+                        positions.setdefault(child.key, child)
+
+            for child in positions.values():
+                for roll in sorted(ROLLS, key=self.probability.get_probability, reverse=True):
+                    legal_moves = self.actions.available_actions(child, roll)
+                    if legal_moves:
+                        action, value = self._search_root(child, legal_moves, depth)
+                        self._replies[(child.key, roll)] = (action, value, depth)
+        except SearchCancelled:
+            pass
+        return len(self._replies)
+
+    def principal_variation(self, state: SenetState, roll: int, action: Optional[tuple],
+                            depth: int) -> list:
+        # The expected line after playing `action` with `roll`: every later ply
+        # assumes the most probable throw and takes the best move for it,
+        # searched to the depth left. Those searches reuse the transposition
+        # table the first search filled. Entries are (roll, action).
+        line = [(roll, action)]
+        likely_roll = max(ROLLS, key=self.probability.get_probability)
+        state = self.result.result(state, action)
+        for remaining in range(depth - 1, 0, -1):
+            if state.is_terminal():
+                break
+            legal_moves = self.actions.available_actions(state, likely_roll)
+            action = self._search_root(state, legal_moves, remaining)[0] if legal_moves else None
+            line.append((likely_roll, action))
+            self.result.apply(state, action)
+        return line
+
+    def _iterative_deepening(self, state: SenetState, legal_moves: list,
+                             deadline: float) -> Tuple[tuple, float]:
+        # Depth 1 always completes so there is a move to return; deeper
+        # iterations are abandoned as soon as the deadline passes and the
+        # last completed one is kept.
+        start_time = time.time()
+        best_action, best_value = self._search_root(state, legal_moves, 1)
+        self.completed_depth = 1
+        self.last_stats.iterations.append((1, best_action, best_value, self.nodes_explored,
+                                           time.time() - start_time))
+
+        self._set_deadline(deadline)
+        try:
+            for depth in range(2, MAX_ITERATIVE_DEPTH + 1):
+                if time.time() >= deadline:
+                    break
+                ordered = [best_action] + [move for move in legal_moves if move != best_action]
+                try:
+                    best_action, best_value = self._search_root(state, ordered, depth)
+                except SearchTimeout:
+                    break
+                self.completed_depth = depth
+                self.last_stats.iterations.append((depth, best_action, best_value, self.nodes_explored,
+                                                   time.time() - start_time))
+        finally:
+            self._set_deadline(None)
+
+        return best_action, best_value
+
+    def _search_root(self, state: SenetState, legal_moves: list, depth: int) -> Tuple[tuple, float]:
+        if self.workers > 1 and depth > 1:
+            return self._search_root_parallel(state, legal_moves, depth)
+
+        # Values are always from White's side: White picks the highest, Black the lowest.
+        maximize = state.current_player == Player.WHITE
         best_action = None
-        best_value = float('-inf')
+        best_value = float('-inf') if maximize else float('inf')
         alpha = float('-inf')
         beta = float('inf')
+        root_values = []
+        self._root_depth = depth
 
-        for i, move in enumerate(legal_moves, 1):
-            from_idx, to_idx = list(move.items())[0]
-            action = (from_idx, to_idx)
+        for action in legal_moves:
+            undo = self.result.apply(state, action)
+            try:
+                value = self._expectiminimax(state, depth - 1, not maximize, alpha, beta)
+            finally:
+                # Undo records are full snapshots, so this also restores the
+                # root after a timeout unwound the search mid-tree.
+                self.result.undo(state, undo)
             
-            new_state = self.result.result(state, action)
-            value = self._expectiminimax(new_state, self.max_depth - 1, False, alpha, beta)
+            root_values.append((action, value))
             
-            if self.verbose:
-                status = "New best evaluation value" if value > best_value else ""
-                print(f"  [{i}] {from_idx}→{to_idx}: {value:.2f} {status}")
-            
-            if value > best_value:
+            if value > best_value if maximize else value < best_value:
                 best_value = value
                 best_action = action
-                alpha = max(alpha, value)
+                if maximize:
+                    alpha = value
+                else:
+                    beta = value
 
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-        
-        if self.verbose:
-            print(f"\nChosen action: {best_action} = {best_value:.2f}")
-            print(f"Total nodes explored: {self.nodes_explored} | TT Hits: {self.tt_hits}")
-            print(f"Time taken: {elapsed_time:.4f} seconds")
-            print("="*60 + "\n")
-        
+        self._root_values = root_values
+        return best_action, best_value
+
+    def _search_root_parallel(self, state: SenetState, legal_moves: list, depth: int) -> Tuple[tuple, float]:
+        # Every task returns an exact value, so taking the first strictly
+        # better move in generation order picks the same move as the serial
+        # search, which only skips moves that cannot beat the current best.
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        packed = state.pack()
+        split = self.split_rolls
+        jobs = []
+        for action in legal_moves:
+            if split:
+                undo = self.result.apply(state, action)
+                settled = state.is_terminal()
+                self.result.undo(state, undo)
+            rolls = ROLLS if split and not settled else (None,)
+            jobs.append([self._pool.submit(_search_root_task, self._settings(), packed, action, roll,
+                                           depth, self._deadline) for roll in rolls])
+
+        maximize = state.current_player == Player.WHITE
+        best_action = None
+        best_value = float('-inf') if maximize else float('inf')
+        timed_out = False
+        root_values = []
+        for action, futures in zip(legal_moves, jobs):
+            values = []
+            for future in futures:
+                if self._cancelled:
+                    for pending in jobs:
+                        for task in pending:
+                            task.cancel()
+                    raise SearchCancelled
+                value, counters = future.result()
+                self._add_counters(counters)
+                values.append(value)
+            if None in values:
+                timed_out = True
+                continue
+            if len(values) == 1:
+                value = values[0]
+            else:
+                self.nodes_explored += 1
+                value = sum(self.probability.get_probability(roll) * v for roll, v in zip(ROLLS, values))
+
+            root_values.append((action, value))
+
+            if value > best_value if maximize else value < best_value:
+                best_value = value
+                best_action = action
+
+        if timed_out:
+            raise SearchTimeout
+        self._root_values = root_values
         return best_action, best_value
 
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def cancel(self) -> None:
+        # Callable from another thread: the running choose_move stops within a
+        # node and raises SearchCancelled. So does a search that was handed
+        # out before the call but has not started yet, provided the caller
+        # passed it the generation read at hand-off.
+        self.generation += 1
+        self._next_deadline_check = 0
+
+    @property
+    def _cancelled(self) -> bool:
+        return self._search_generation != self.generation
+
+    def _begin(self, generation: Optional[int]) -> None:
+        # The flag is never reset on the searching thread: a cancel() landing
+        # between hand-off and this call would be lost.
+        self._search_generation = self.generation if generation is None else generation
+
+    def _set_deadline(self, deadline: Optional[float]) -> None:
+        self._deadline = deadline
+        self._next_deadline_check = (self.nodes_explored + DEADLINE_CHECK_INTERVAL
+                                     if deadline is not None else float('inf'))
+        if self._cancelled:
+            self._next_deadline_check = 0
+
+    def _check_deadline(self) -> None:
+        # The next check is scheduled before the flag is read, so a cancel()
+        # racing with this call is seen either here or at the next node.
+        self._next_deadline_check = (self.nodes_explored + DEADLINE_CHECK_INTERVAL
+                                     if self._deadline is not None else float('inf'))
+        if self._cancelled:
+            raise SearchCancelled
+        if self._deadline is not None and time.time() >= self._deadline:
+            raise SearchTimeout
+
+    def _settings(self) -> tuple:
+        tablebase_path = self.tablebase.path if self.tablebase else None
+        return (self.transposition_table.capacity, self.star2, self.batch_leaves, tablebase_path,
+                heuristic.WEIGHTS, self.ordering is not None)
+
+    def _sync_weights(self) -> None:
+        # Stored values were scored with the heuristic weights of their search;
+        # after heuristic.set_weights they are stale, so they are dropped.
+        if self._weights != heuristic.WEIGHTS:
+            self._weights = heuristic.WEIGHTS
+            self.transposition_table.clear()
+            self._replies = {}
+
+    def _new_search(self) -> None:
+        if self.ordering is not None:
+            self.ordering.new_search()
+
+    def _reset_counters(self) -> None:
+        self.nodes_explored = 0
+        self.pruned_nodes = 0
+        self.first_move_cutoffs = 0
+        self.star1_cutoffs = 0
+        self.star2_cutoffs = 0
+        self.star2_probes = 0
+        self.tt_hits = 0
+
+    def _counters(self) -> tuple:
+        return (self.nodes_explored, self.pruned_nodes, self.first_move_cutoffs, self.star1_cutoffs,
+                self.star2_cutoffs, self.star2_probes, self.tt_hits)
+
+    def _add_counters(self, counters: tuple) -> None:
+        nodes, pruned, first_move, star1, star2, probes, tt_hits = counters
+        self.nodes_explored += nodes
+        self.pruned_nodes += pruned
+        self.first_move_cutoffs += first_move
+        self.star1_cutoffs += star1
+        self.star2_cutoffs += star2
+        self.star2_probes += probes
+        self.tt_hits += tt_hits
+
     def _expectiminimax(self, state: SenetState, depth: int, is_max_player: bool, 
                        alpha: float, beta: float) -> float:
         self.nodes_explored += 1
+        if self.nodes_explored >= self._next_deadline_check:
+            self._check_deadline()
         
         if state.is_terminal():
-            return Heuristic.evaluate(state)
+            return self._evaluate(state)
+        
+        if self.tablebase is not None:
+            exact = self.tablebase.probe(state)
+            if exact is not None:
+                return exact
         
         if depth == 0:
-            return Heuristic.evaluate(state)
+            return self._evaluate(state)
         
-        state_key = (tuple(state.board), state.current_player, depth, is_max_player)
-        if state_key in self.transposition_table:
+        state_key = state.key ^ MAX_NODE_KEY if is_max_player else state.key
+        cached = self.transposition_table.probe(state_key, depth, alpha, beta)
+        if cached is not None:
             self.tt_hits += 1
-            return self.transposition_table[state_key]
+            return cached
         
-        value = self._chance_node(state, depth, is_max_player, alpha, beta)
+        if depth == 1 and self.batch_leaves:
+            value = self._frontier_node(state, is_max_player)
+        else:
+            value = self._chance_node(state, depth, is_max_player, alpha, beta)
         
-        self.transposition_table[state_key] = value
+        if value <= alpha:
+            flag = UPPER_BOUND
+        elif value >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.transposition_table.store(state_key, depth, value, flag)
         
         return value
 
     def _chance_node(self, state: SenetState, depth: int, is_max_player: bool,
                     alpha: float, beta: float) -> float:
-        expected_value = 0.0
-        
-        for roll in [1, 2, 3, 4, 5]:
-            probability = self.probability.get_probability(roll)
-            legal_moves = self.actions.available_actions(state, roll)
-            
-            if not legal_moves:
-                new_state = state.copy()
-                new_state.current_player = new_state.current_player.opponent()
-                value = self._expectiminimax(new_state, depth - 1, not is_max_player, alpha, beta)
-                expected_value += probability * value
-            else:
+        # *-minimax (Ballard): every roll's value lies in [MIN_SCORE, MAX_SCORE], so
+        # the expectation can be bounded before all rolls are searched. `lower` and
+        # `upper` hold the bounds known for each roll, and each roll is searched
+        # only inside the window that could still move the expectation across
+        # alpha or beta.
+        probabilities = [self.probability.get_probability(roll) for roll in ROLLS]
+        if self.ordering is not None and depth >= ORDERING_MIN_DEPTH:
+            moves_per_roll = [self._ordered_moves(state, roll, depth) for roll in ROLLS]
+        else:
+            moves_per_roll = [self.actions.available_actions(state, roll) for roll in ROLLS]
+        lower = [MIN_SCORE] * len(ROLLS)
+        upper = [MAX_SCORE] * len(ROLLS)
+        lower_sum = float(MIN_SCORE)
+        upper_sum = float(MAX_SCORE)
+
+        # Star2: the first move of every roll gives a bound for the whole roll
+        # (a lower bound for MAX, an upper bound for MIN), which may already
+        # decide the node.
+        if self.star2:
+            for i, legal_moves in enumerate(moves_per_roll):
+                if not legal_moves:
+                    continue
+                probability = probabilities[i]
+                self.star2_probes += 1
                 if is_max_player:
-                    max_value = self._max_node(state, legal_moves, depth, alpha, beta)
-                    expected_value += probability * max_value
+                    window_high = (beta - (lower_sum - probability * lower[i])) / probability
+                    value = self._probe_move(state, legal_moves[0], depth, False, MIN_SCORE, min(window_high, MAX_SCORE))
+                    if value > lower[i]:
+                        lower_sum += probability * (value - lower[i])
+                        lower[i] = value
+                    if lower_sum >= beta:
+                        self.star2_cutoffs += 1
+                        return lower_sum
                 else:
-                    min_value = self._min_node(state, legal_moves, depth, alpha, beta)
-                    expected_value += probability * min_value
-        
-        return expected_value
+                    window_low = (alpha - (upper_sum - probability * upper[i])) / probability
+                    value = self._probe_move(state, legal_moves[0], depth, True, max(window_low, MIN_SCORE), MAX_SCORE)
+                    if value < upper[i]:
+                        upper_sum -= probability * (upper[i] - value)
+                        upper[i] = value
+                    if upper_sum <= alpha:
+                        self.star2_cutoffs += 1
+                        return upper_sum
+
+        # Star1: search each roll with the window implied by the bounds of the others.
+        for i, roll in enumerate(ROLLS):
+            probability = probabilities[i]
+            window_low = (alpha - (upper_sum - probability * upper[i])) / probability
+            window_high = (beta - (lower_sum - probability * lower[i])) / probability
+            child_alpha = max(window_low, lower[i])
+            child_beta = min(window_high, upper[i])
+
+            value = self._roll_value(state, roll, depth, is_max_player, child_alpha, child_beta,
+                                     moves_per_roll[i], self.star2)
+
+            if value <= child_alpha:
+                if child_alpha == window_low:
+                    upper_sum -= probability * (upper[i] - value)
+                    self.star1_cutoffs += 1
+                    return min(upper_sum, alpha)
+                # The window was clamped by the known lower bound, so the roll is worth exactly that.
+                value = lower[i]
+            elif value >= child_beta:
+                if child_beta == window_high:
+                    lower_sum += probability * (value - lower[i])
+                    self.star1_cutoffs += 1
+                    return max(lower_sum, beta)
+                value = upper[i]
+
+            lower_sum += probability * (value - lower[i])
+            upper_sum -= probability * (upper[i] - value)
+            lower[i] = upper[i] = value
+
+        return sum(p * v for p, v in zip(probabilities, lower))
+
+    def _frontier_node(self, state: SenetState, is_max_player: bool) -> float:
+        # Chance node one ply above the leaves: every child for every roll is
+        # collected and scored in a single batch_heuristic call. Children the
+        # tablebase knows take its exact value instead, as they would in
+        # _expectiminimax. The result is the exact expectation, summed the same
+        # way _chance_node sums it.
+        positions = []
+        spans = []
+        exact = {}
+        tablebase = self.tablebase
+        for roll in ROLLS:
+            start = len(positions)
+            for move in self.actions.available_actions(state, roll) or (None,):
+                undo = self.result.apply(state, move)
+                if tablebase is not None and not state.is_terminal():
+                    value = tablebase.probe(state)
+                    if value is not None:
+                        exact[len(positions)] = value
+                positions.append((state.white, state.black, state.white_goal_count, state.black_goal_count))
+                self.result.undo(state, undo)
+            spans.append((start, len(positions)))
+
+        self.nodes_explored += len(positions)
+        values = self._evaluate_positions(positions).tolist()
+        for index, value in exact.items():
+            values[index] = value
+        pick = max if is_max_player else min
+        probabilities = [self.probability.get_probability(roll) for roll in ROLLS]
+        roll_values = [pick(values[start:end]) for start, end in spans]
+        return sum(p * v for p, v in zip(probabilities, roll_values))
+
+    def _ordered_moves(self, state: SenetState, roll: int, depth: int) -> tuple:
+        legal_moves = self.actions.available_actions(state, roll)
+        if len(legal_moves) < 2:
+            return legal_moves
+        hash_move = self.transposition_table.probe_move(state.key ^ ROLL_KEYS[roll])
+        return self.ordering.order(state, legal_moves, roll, depth, hash_move)
+
+    def _roll_value(self, state: SenetState, roll: int, depth: int, is_max_player: bool,
+                    alpha: float, beta: float, legal_moves: Optional[list] = None,
+                    probed: bool = False) -> float:
+        # `probed`: Star2 already searched the first move of this roll.
+        if legal_moves is None:
+            if self.ordering is not None and depth >= ORDERING_MIN_DEPTH:
+                legal_moves = self._ordered_moves(state, roll, depth)
+            else:
+                legal_moves = self.actions.available_actions(state, roll)
+
+        if not legal_moves:
+            undo = self.result.apply(state, None)
+            value = self._expectiminimax(state, depth - 1, not is_max_player, alpha, beta)
+            self.result.undo(state, undo)
+            return value
+        if is_max_player:
+            return self._max_node(state, legal_moves, depth, alpha, beta, roll, probed)
+        return self._min_node(state, legal_moves, depth, alpha, beta, roll, probed)
+
+    def _probe_move(self, state: SenetState, move: tuple, depth: int, is_max_child: bool,
+                    alpha: float, beta: float) -> float:
+        undo = self.result.apply(state, move)
+        value = self._expectiminimax(state, depth - 1, is_max_child, alpha, beta)
+        self.result.undo(state, undo)
+        return value
 
     def _max_node(self, state: SenetState, legal_moves: list, depth: int,
-                  alpha: float, beta: float) -> float:
+                  alpha: float, beta: float, roll: int, probed: bool) -> float:
         max_value = float('-inf')
+        first_move = 1 if probed else 0
+        best_move = None
+        original_alpha = alpha
         
-        for move in legal_moves:
-            from_idx, to_idx = list(move.items())[0]
-            new_state = self.result.result(state, (from_idx, to_idx))
+        for index, move in enumerate(legal_moves):
+            undo = self.result.apply(state, move)
+            value = self._expectiminimax(state, depth - 1, False, alpha, beta)
+            self.result.undo(state, undo)
             
-            value = self._expectiminimax(new_state, depth - 1, False, alpha, beta)
-            max_value = max(max_value, value)
+            if value > max_value:
+                max_value = value
+                best_move = move
             
             alpha = max(alpha, value)
             if beta <= alpha:
                 self.pruned_nodes += 1
+                if index == first_move:
+                    self.first_move_cutoffs += 1
+                if self.ordering is not None:
+                    self.ordering.cutoff(move, roll, depth)
                 break
         
+        if self.ordering is not None and max_value > original_alpha:
+            self._store_best_move(state, roll, depth, best_move)
         return max_value
 
     def _min_node(self, state: SenetState, legal_moves: list, depth: int,
-                  alpha: float, beta: float) -> float:
+                  alpha: float, beta: float, roll: int, probed: bool) -> float:
         min_value = float('inf')
+        first_move = 1 if probed else 0
+        best_move = None
+        original_beta = beta
         
-        for move in legal_moves:
-            from_idx, to_idx = list(move.items())[0]
-            new_state = self.result.result(state, (from_idx, to_idx))
+        for index, move in enumerate(legal_moves):
+            undo = self.result.apply(state, move)
+            value = self._expectiminimax(state, depth - 1, True, alpha, beta)
+            self.result.undo(state, undo)
             
-            value = self._expectiminimax(new_state, depth - 1, True, alpha, beta)
-            min_value = min(min_value, value)
+            if value < min_value:
+                min_value = value
+                best_move = move
             
             beta = min(beta, value)
             if beta <= alpha:
                 self.pruned_nodes += 1
+                if index == first_move:
+                    self.first_move_cutoffs += 1
+                if self.ordering is not None:
+                    self.ordering.cutoff(move, roll, depth)
                 break
         
+        if self.ordering is not None and min_value < original_beta:
+            self._store_best_move(state, roll, depth, best_move)
         return min_value
 
-    def execute_turn(self, state: SenetState, roll: int) -> tuple[SenetState, Optional[tuple]]:
-        best_action, value = self.choose_move(state, roll)
+    def _store_best_move(self, state: SenetState, roll: int, depth: int, move: tuple) -> None:
+        # Nodes that failed low have no best move worth remembering, so only
+        # exact values and cutoffs are stored.
+        if depth >= ORDERING_MIN_DEPTH:
+            self.transposition_table.store_move(state.key ^ ROLL_KEYS[roll], move)
+
+    def pruning_stats(self) -> dict:
+        return {
+            "nodes": self.nodes_explored,
+            "alpha_beta_cutoffs": self.pruned_nodes,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "star1_cutoffs": self.star1_cutoffs,
+            "star2_cutoffs": self.star2_cutoffs,
+            "star2_probes": self.star2_probes,
+        }
+
+    def execute_turn(self, state: SenetState, roll: int,
+                     time_limit: Optional[float] = None) -> tuple[SenetState, Optional[tuple]]:
+        best_action, value = self.choose_move(state, roll, time_limit)
         
         if best_action is None:
-            new_state = state.copy()
-            new_state.current_player = new_state.current_player.opponent()
+            new_state = self.result.result(state, None)
             if self.ui_callback:
                 self.ui_callback()
             return new_state, None
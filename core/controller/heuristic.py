@@ -1,55 +1,162 @@
+import json
+from typing import Sequence
+
 from core.states import SenetState
-from core.component.player import Player
+from core.component.bitboard import BOARD_SIZE
+from core.component.zobrist import MAX_PIECES
+
+MAX_SCORE = 10000
+MIN_SCORE = -MAX_SCORE
+
+GOAL_WEIGHT = 1000
+PIECE_WEIGHT = 50
+SQUARE_WEIGHT = 10
+HOUSE_WEIGHT = 50
+BLOCKING_WEIGHT = 5
+THREAT_WEIGHT = 15
+
+# The evaluation is linear in these weights; set_weights / load_weights
+# replace them, e.g. with the output of core.tuning. They are kept integral
+# so Heuristic and batch_heuristic give identical scores.
+WEIGHT_NAMES = ("goal", "piece", "square", "house", "blocking", "threat")
+DEFAULT_WEIGHTS = (GOAL_WEIGHT, PIECE_WEIGHT, SQUARE_WEIGHT, HOUSE_WEIGHT, BLOCKING_WEIGHT, THREAT_WEIGHT)
+WEIGHTS = DEFAULT_WEIGHTS
+
+# Largest |feature| over non-terminal positions, where both sides still have
+# a piece on the board, in WEIGHT_NAMES order. Star1/Star2 pruning needs every
+# non-terminal score strictly between MIN_SCORE and MAX_SCORE, the scores of
+# finished games, so set_weights refuses weights that could leave that range.
+FEATURE_BOUNDS = (MAX_PIECES - 1, MAX_PIECES - 1, sum(range(BOARD_SIZE - MAX_PIECES, BOARD_SIZE)), 4,
+                  MAX_PIECES * MAX_PIECES, MAX_PIECES)
+
+
+def _square_value(i: int) -> int:
+    value = i * SQUARE_WEIGHT
+    if i == 25:
+        value += HOUSE_WEIGHT
+    elif i in {27, 28, 29}:
+        value -= HOUSE_WEIGHT
+    return value
+
+
+# Sum of SQUARE_VALUES over the set bits of a mask, looked up ten squares at a time.
+_CHUNK_BITS = 10
+_CHUNK_MASK = (1 << _CHUNK_BITS) - 1
+
+
+def _square_tables() -> tuple:
+    square_values = tuple(_square_value(i) for i in range(BOARD_SIZE))
+    chunk_sums = tuple(
+        tuple(sum(square_values[base + j] for j in range(_CHUNK_BITS) if chunk >> j & 1) for chunk in range(1 << _CHUNK_BITS))
+        for base in range(0, BOARD_SIZE, _CHUNK_BITS)
+    )
+    return square_values, chunk_sums
+
+
+SQUARE_VALUES, _CHUNK_SUMS = _square_tables()
+# Square tables per weight set, so engines that take turns with different
+# weights (as in SPSA games) do not rebuild them on every switch.
+_tables = {WEIGHTS: (SQUARE_VALUES, _CHUNK_SUMS)}
+
+
+def score_bound(weights: Sequence[float]) -> float:
+    # No non-terminal position scores further from 0 than this under `weights`.
+    return sum(abs(weight) * bound for weight, bound in zip(weights, FEATURE_BOUNDS))
+
+
+def bounded_weights(weights: Sequence[float]) -> tuple:
+    # `weights` rounded to integers and, if they could reach MAX_SCORE, all
+    # scaled towards zero by the same factor until they cannot.
+    weights = tuple(int(round(weight)) for weight in weights)
+    bound = score_bound(weights)
+    if bound < MAX_SCORE:
+        return weights
+    factor = (MAX_SCORE - 1) / bound
+    return tuple(int(weight * factor) for weight in weights)
+
+
+def set_weights(weights: Sequence[float]) -> tuple:
+    # Weights in WEIGHT_NAMES order, rounded to integers. Searches started
+    # afterwards use them; engines drop transposition entries scored with the old ones.
+    global WEIGHTS, GOAL_WEIGHT, PIECE_WEIGHT, SQUARE_WEIGHT, HOUSE_WEIGHT, BLOCKING_WEIGHT, THREAT_WEIGHT
+    global SQUARE_VALUES, _CHUNK_SUMS
+    if len(weights) != len(WEIGHT_NAMES):
+        raise ValueError(f"expected {len(WEIGHT_NAMES)} weights, got {len(weights)}")
+    weights = tuple(int(round(weight)) for weight in weights)
+    if score_bound(weights) >= MAX_SCORE:
+        raise ValueError(f"weights {weights} can score {score_bound(weights)}, "
+                         f"not below MAX_SCORE ({MAX_SCORE}); see bounded_weights")
+    GOAL_WEIGHT, PIECE_WEIGHT, SQUARE_WEIGHT, HOUSE_WEIGHT, BLOCKING_WEIGHT, THREAT_WEIGHT = weights
+    WEIGHTS = weights
+    if weights not in _tables:
+        _tables[weights] = _square_tables()
+    SQUARE_VALUES, _CHUNK_SUMS = _tables[weights]
+    return weights
+
+
+def read_weights(path: str) -> tuple:
+    # A JSON object with one entry per name in WEIGHT_NAMES; other keys are ignored.
+    with open(path) as f:
+        entries = json.load(f)
+    return tuple(int(round(entries[name])) for name in WEIGHT_NAMES)
+
+
+def load_weights(path: str) -> tuple:
+    return set_weights(read_weights(path))
+
+
+def save_weights(path: str, weights: Sequence[float], **info) -> None:
+    with open(path, "w") as f:
+        json.dump({**dict(zip(WEIGHT_NAMES, (int(round(w)) for w in weights))), **info}, f, indent=2)
+        f.write("\n")
+
+
+def _squares_value(mask: int) -> int:
+    low, mid, high = _CHUNK_SUMS
+    return low[mask & _CHUNK_MASK] + mid[(mask >> 10) & _CHUNK_MASK] + high[mask >> 20]
+
+
+def _threat_zone(mask: int) -> int:
+    # Squares one to five ahead of any piece in `mask`, built by doubling the window.
+    zone = mask << 1
+    zone |= zone << 1
+    zone |= zone << 2
+    return zone | (mask << 5)
+
 
 class Heuristic:
-    
+
     def evaluate(state: SenetState) -> float:
-        white_count = state.white_number()
-        black_count = state.black_number()
-
-        if white_count == 0:
-            return 10000
-        if black_count == 0:
-            return -10000
-        
-        score = (state.white_goal_count - state.black_goal_count) * 1000
-
-        score += (black_count - white_count) * 50
-
-        white_positions = []
-        black_positions = []
-        
-        for i, cell in enumerate(state.board):
-            if cell == Player.WHITE.value:
-                white_positions.append(i)
-                score += i * 10
-                if i == 25:
-                    score += 50
-                elif i in {27, 28, 29}:
-                    score -= 50
-                    
-            elif cell == Player.BLACK.value:
-                black_positions.append(i)
-                score -= i * 10
-                if i == 25:
-                    score -= 50
-                elif i in {27, 28, 29}:
-                    score += 50
-        
-        for w_pos in white_positions:
-            blocking = sum(1 for b_pos in black_positions if w_pos > b_pos)
-            score += blocking * 5
-        
-        for b_pos in black_positions:
-            blocking = sum(1 for w_pos in white_positions if b_pos > w_pos)
-            score -= blocking * 5
-        
-        for w_pos in white_positions:
-            if any(0 < w_pos - b_pos <= 5 for b_pos in black_positions):
-                score -= 15
-        
-        for b_pos in black_positions:
-            if any(0 < b_pos - w_pos <= 5 for w_pos in white_positions):
-                score += 15
-        
-        return score
\ No newline at end of file
+        white = state.white
+        black = state.black
+
+        if not white:
+            return MAX_SCORE
+        if not black:
+            return MIN_SCORE
+
+        return Heuristic.material(state) + Heuristic.interaction(white, black)
+
+    def material(state: SenetState) -> int:
+        # Goals, piece counts and squares: a sum over single pieces.
+        score = (state.white_goal_count - state.black_goal_count) * GOAL_WEIGHT
+        score += (state.black.bit_count() - state.white.bit_count()) * PIECE_WEIGHT
+        score += _squares_value(state.white) - _squares_value(state.black)
+        return score
+
+    def interaction(white: int, black: int) -> int:
+        # Blocking: every (white, black) pair with the white piece further ahead
+        # is worth +5 and every reversed pair -5, so only the white-ahead count
+        # is needed: pairs_ahead - (white_count * black_count - pairs_ahead).
+        pairs_ahead = 0
+        remaining = white
+        while remaining:
+            low = remaining & -remaining
+            pairs_ahead += (black & (low - 1)).bit_count()
+            remaining ^= low
+        score = (2 * pairs_ahead - white.bit_count() * black.bit_count()) * BLOCKING_WEIGHT
+
+        # Threats: pieces with an opposing piece at most five squares behind.
+        score -= (white & _threat_zone(black)).bit_count() * THREAT_WEIGHT
+        score += (black & _threat_zone(white)).bit_count() * THREAT_WEIGHT
+        return score
@@ -0,0 +1,276 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from core.actions import Action
+from core.controller.expectiminimax import SearchCancelled
+from core.controller.heuristic import Heuristic
+from core.controller.probability import Probability
+from core.results import Result
+from core.states import WHITE_SIDE, SenetState
+
+# Rewards lie in [0, 1] but Heuristic differences between sibling moves map
+# to a few hundredths of that, hence the small exploration constant.
+EXPLORATION = 0.1
+# Plies of random (or guided) play before a new leaf is scored. On sampled
+# positions, scoring the leaf directly chose better moves than random
+# playouts, which mostly add noise; guided playouts come close.
+ROLLOUT_DEPTH = 0
+# Heuristic scores at the end of a rollout are squashed to a White win
+# probability with 1 / (1 + exp(-score / ROLLOUT_SCALE)).
+ROLLOUT_SCALE = 1000.0
+GUIDED_EPSILON = 0.2
+CANCEL_CHECK_INTERVAL = 64
+
+
+class _DecisionNode:
+    # A player to move with a known roll. `wins` is the sum of White rewards.
+    __slots__ = ("moves", "children", "untried", "visits", "wins")
+
+    def __init__(self, moves: tuple):
+        self.moves = moves
+        self.children: dict = {}
+        self.untried = list(moves)
+        self.visits = 0
+        self.wins = 0.0
+
+
+class _ChanceNode:
+    # The position after a move, before the next player throws: one child per roll seen so far.
+    __slots__ = ("children", "visits", "wins")
+
+    def __init__(self):
+        self.children: dict = {}
+        self.visits = 0
+        self.wins = 0.0
+
+
+def _search_task(settings: tuple, packed_state: tuple, roll: int, playouts: Optional[int],
+                 deadline: Optional[float], seed: int) -> tuple:
+    # Runs in a pool process: an independent tree for root parallelism.
+    exploration, rollout_depth, guided = settings
+    engine = MCTS(exploration=exploration, rollout_depth=rollout_depth, guided=guided, seed=seed, verbose=False)
+    state = SenetState.unpack(packed_state)
+    root = engine._search(state, roll, playouts, deadline)
+    return ([(move, child.visits, child.wins) for move, child in root.children.items()],
+            engine.nodes_explored, engine.completed_depth)
+
+
+class MCTS:
+    # Monte Carlo tree search with the same choose_move / execute_turn
+    # interface as Expectiminimax. Decision nodes pick moves by UCT; chance
+    # nodes sample the next throw with Probability.throw_sticks, so rolls are
+    # visited in proportion to their probability. Rollouts play random (or,
+    # with guided=True, mostly greedy) moves for at most rollout_depth plies (none
+    # by default) and score the end position as a White win probability. The returned value is
+    # that probability for the chosen move, not a Heuristic score.
+
+    def __init__(self, ui_callback: Optional[Callable[[], None]] = None, playouts: int = 2000,
+                 time_limit: Optional[float] = None, exploration: float = EXPLORATION,
+                 rollout_depth: int = ROLLOUT_DEPTH, guided: bool = False, workers: int = 0,
+                 seed: Optional[int] = None, verbose: bool = True):
+        self._rng = random.Random(seed)
+        self.probability = Probability(self._rng)
+        self.actions = Action()
+        self.result = Result()
+        self.ui_callback = ui_callback
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self.guided = guided
+        self.workers = workers
+        self.verbose = verbose
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # cancel() bumps the generation; see Expectiminimax.cancel.
+        self.generation = 0
+        self._search_generation = 0
+
+        # Counterparts of the Expectiminimax attributes DisplayBoard reads:
+        # playouts run and the deepest decision ply reached.
+        self.max_depth = 0
+        self.nodes_explored = 0
+        self.completed_depth = 0
+
+    def choose_move(self, state: SenetState, roll: int, time_limit: Optional[float] = None,
+                    generation: Optional[int] = None) -> Tuple[Optional[tuple], float]:
+        self._search_generation = self.generation if generation is None else generation
+        self.nodes_explored = 0
+        self.completed_depth = 0
+        if time_limit is None:
+            time_limit = self.time_limit
+        start_time = time.time()
+        deadline = start_time + time_limit if time_limit is not None else None
+        playouts = self.playouts if time_limit is None else None
+
+        legal_moves = self.actions.available_actions(state, roll)
+        if not legal_moves:
+            return None, self._reward(state)
+
+        if self.workers > 1:
+            stats = self._search_parallel(state, roll, playouts, deadline)
+        else:
+            root = self._search(state.copy(), roll, playouts, deadline)
+            stats = [(move, child.visits, child.wins) for move, child in root.children.items()]
+
+        # Most visited move; ties go to the earlier move in generation order.
+        order = {move: i for i, move in enumerate(legal_moves)}
+        best_action, visits, wins = max(stats, key=lambda entry: (entry[1], -order[entry[0]]))
+        value = wins / visits if visits else 0.5
+        if self.verbose:
+            print(f"MCTS: Roll={roll} | {best_action} = {value:.3f} ({visits} visits) | "
+                  f"{self.nodes_explored} playouts, depth {self.completed_depth}, "
+                  f"{time.time() - start_time:.4f} seconds")
+        return best_action, value
+
+    def execute_turn(self, state: SenetState, roll: int,
+                     time_limit: Optional[float] = None) -> tuple[SenetState, Optional[tuple]]:
+        best_action, _ = self.choose_move(state, roll, time_limit)
+        new_state = self.result.result(state, best_action)
+        if self.ui_callback:
+            self.ui_callback()
+        return new_state, best_action
+
+    def set_ui_callback(self, callback: Callable[[], None]) -> None:
+        self.ui_callback = callback
+
+    def cancel(self) -> None:
+        self.generation += 1
+
+    @property
+    def _cancelled(self) -> bool:
+        return self._search_generation != self.generation
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _search_parallel(self, state: SenetState, roll: int, playouts: Optional[int],
+                         deadline: Optional[float]) -> list:
+        # Root parallelism: every worker grows its own tree from a different
+        # seed and the root statistics are summed.
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        share = None if playouts is None else -(-playouts // self.workers)
+        settings = (self.exploration, self.rollout_depth, self.guided)
+        packed = state.pack()
+        futures = [self._pool.submit(_search_task, settings, packed, roll, share, deadline,
+                                     self._rng.getrandbits(32))
+                   for _ in range(self.workers)]
+
+        totals = {}
+        for future in futures:
+            if self._cancelled:
+                for pending in futures:
+                    pending.cancel()
+                raise SearchCancelled
+            children, playouts_run, depth = future.result()
+            self.nodes_explored += playouts_run
+            self.completed_depth = max(self.completed_depth, depth)
+            for move, visits, wins in children:
+                total = totals.setdefault(move, [0, 0.0])
+                total[0] += visits
+                total[1] += wins
+        return [(move, visits, wins) for move, (visits, wins) in totals.items()]
+
+    def _search(self, state: SenetState, roll: int, playouts: Optional[int],
+                deadline: Optional[float]) -> _DecisionNode:
+        root = _DecisionNode(self.actions.available_actions(state, roll))
+        root_key = state.pack()
+        iteration = 0
+        while playouts is None or iteration < playouts:
+            if iteration % CANCEL_CHECK_INTERVAL == 0:
+                if self._cancelled:
+                    raise SearchCancelled
+                if deadline is not None and iteration and time.time() >= deadline:
+                    break
+            self._playout(root, SenetState.unpack(root_key))
+            iteration += 1
+            self.nodes_explored += 1
+        return root
+
+    def _playout(self, root: _DecisionNode, state: SenetState) -> None:
+        path = [root]
+        node = root
+        depth = 0
+        while True:
+            # Decision node: expand one untried move, or descend by UCT.
+            white_to_move = state.side == WHITE_SIDE
+            depth += 1
+            if node.untried:
+                move = node.untried.pop(self._rng.randrange(len(node.untried)))
+                child = node.children[move] = _ChanceNode()
+                self.result.apply(state, move)
+                path.append(child)
+                reward = self._rollout(state)
+                break
+            move, child = self._select(node, white_to_move)
+            self.result.apply(state, move)
+            path.append(child)
+            if state.is_terminal():
+                reward = self._reward(state)
+                break
+
+            # Chance node: sample the next throw.
+            next_roll = self.probability.throw_sticks()
+            node = child.children.get(next_roll)
+            if node is None:
+                node = child.children[next_roll] = _DecisionNode(
+                    self.actions.available_actions(state, next_roll) or (None,))
+            path.append(node)
+
+        self.completed_depth = max(self.completed_depth, depth)
+        for visited in path:
+            visited.visits += 1
+            visited.wins += reward
+
+    def _select(self, node: _DecisionNode, white_to_move: bool) -> tuple:
+        log_visits = math.log(node.visits)
+        best = None
+        best_score = float('-inf')
+        for move, child in node.children.items():
+            mean = child.wins / child.visits
+            if not white_to_move:
+                mean = 1.0 - mean
+            score = mean + self.exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best_score = score
+                best = (move, child)
+        return best
+
+    def _rollout(self, state: SenetState) -> float:
+        for _ in range(self.rollout_depth):
+            if state.is_terminal():
+                break
+            moves = self.actions.available_actions(state, self.probability.throw_sticks())
+            if not moves:
+                move = None
+            elif self.guided and self._rng.random() >= GUIDED_EPSILON:
+                move = self._greedy_move(state, moves)
+            else:
+                move = self._rng.choice(moves)
+            self.result.apply(state, move)
+        return self._reward(state)
+
+    def _greedy_move(self, state: SenetState, moves: tuple) -> tuple:
+        sign = 1 if state.side == WHITE_SIDE else -1
+        best = None
+        best_score = float('-inf')
+        for move in moves:
+            undo = self.result.apply(state, move)
+            score = sign * Heuristic.evaluate(state)
+            self.result.undo(state, undo)
+            if score > best_score:
+                best_score = score
+                best = move
+        return best
+
+    def _reward(self, state: SenetState) -> float:
+        if not state.white:
+            return 1.0
+        if not state.black:
+            return 0.0
+        return 1.0 / (1.0 + math.exp(-Heuristic.evaluate(state) / ROLLOUT_SCALE))
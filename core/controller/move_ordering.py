@@ -0,0 +1,92 @@
+from operator import itemgetter
+from typing import Optional
+
+from core.actions import EXIT
+from core.component.main_house import HOUSE_OF_HAPPINESS
+
+KILLER_SLOTS = 2
+
+# Scores are summed per move and the moves tried highest first. The bonuses
+# are far apart so the hash move comes first, then exits, captures and
+# landings on the House of Happiness, then killers, then the rest by history.
+# Moves into the water (which go back to the House of Rebirth) go last.
+HASH_MOVE_BONUS = 1 << 30
+EXIT_BONUS = 3 << 24
+CAPTURE_BONUS = 2 << 24
+HAPPINESS_BONUS = 2 << 24
+KILLER_BONUS = 1 << 24
+WATER_PENALTY = -(1 << 24)
+# History scores are halved when one passes this, so they stay below KILLER_BONUS.
+HISTORY_LIMIT = 1 << 22
+
+
+def _static_score(from_pos: int, to_pos: int) -> int:
+    if to_pos == EXIT:
+        return EXIT_BONUS
+    if to_pos == HOUSE_OF_HAPPINESS:
+        return HAPPINESS_BONUS
+    if to_pos < from_pos:
+        return WATER_PENALTY
+    return 0
+
+
+# Indexed by from << 5 | to.
+STATIC_SCORES = tuple(_static_score(index >> 5, index & 31) for index in range(EXIT << 5))
+
+
+class MoveOrdering:
+    # Orders the moves of a MAX/MIN node below the root. Killers are the last
+    # two moves that caused a cutoff at the same remaining depth and roll; the
+    # history table counts cutoffs per (roll, from, to), weighted by depth².
+    # Both are dicts, as only a few hundred of their keys ever occur.
+    # The hash move is passed in by the caller, which keeps it in the
+    # transposition table.
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self.history: dict = {}
+        self.killers: dict = {}
+
+    def new_search(self) -> None:
+        # Killers are only good for the search that found them; history is
+        # aged so the last searches count most.
+        self.killers = {}
+        self._age()
+
+    def order(self, state, legal_moves: tuple, roll: int, depth: int, hash_move: Optional[tuple]) -> tuple:
+        if len(legal_moves) < 2:
+            return legal_moves
+        opponent = state.white if state.side else state.black
+        killers = self.killers.get((depth, roll), ())
+        history = self.history
+        scored = []
+        for move in legal_moves:
+            if move == hash_move:
+                scored.append((HASH_MOVE_BONUS, move))
+                continue
+            from_pos, to_pos = move
+            score = STATIC_SCORES[from_pos << 5 | to_pos] + history.get((roll, from_pos, to_pos), 0)
+            if opponent >> to_pos & 1:
+                score += CAPTURE_BONUS
+            if move in killers:
+                score += KILLER_BONUS
+            scored.append((score, move))
+        # The sort is stable, so equal scores keep generation order.
+        scored.sort(key=itemgetter(0), reverse=True)
+        return tuple(move for _, move in scored)
+
+    def cutoff(self, move: tuple, roll: int, depth: int) -> None:
+        killers = self.killers.setdefault((depth, roll), [None] * KILLER_SLOTS)
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        key = (roll, move[0], move[1])
+        value = self.history.get(key, 0) + depth * depth
+        self.history[key] = value
+        if value > HISTORY_LIMIT:
+            self._age()
+
+    def _age(self) -> None:
+        self.history = {key: value >> 1 for key, value in self.history.items() if value > 1}
@@ -0,0 +1,107 @@
+import argparse
+import mmap
+import struct
+import time
+from typing import Optional
+
+from core.actions import Action, ROLLS
+from core.component.player import Player
+from core.controller.expectiminimax import Expectiminimax
+from core.results import Result
+from core.states import SenetState, create_initial_state
+
+# File layout (little endian): header, then fixed-size records sorted by
+# (state key, roll) so a lookup is a binary search over the mapped file.
+MAGIC = b"SNOB"
+VERSION = 1
+HEADER = struct.Struct("<4sHBxI")
+RECORD = struct.Struct("<QBBBxf")
+
+
+class OpeningBook:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.depth, self.size = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} opening book")
+        self.hits = 0
+
+    def lookup(self, state: SenetState, roll: int) -> Optional[tuple[tuple[int, int], float]]:
+        target = (state.key, roll)
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            key, book_roll, from_idx, to_idx, value = RECORD.unpack_from(
+                self._map, HEADER.size + middle * RECORD.size)
+            if (key, book_roll) < target:
+                low = middle + 1
+            elif (key, book_roll) > target:
+                high = middle
+            else:
+                self.hits += 1
+                return (from_idx, to_idx), value
+        return None
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+def build(path: str, plies: int = 2, depth: int = 4, verbose: bool = True) -> int:
+    # Searches every position reachable in fewer than `plies` plies from the
+    # initial position (either side starting), for every roll. The opponent
+    # may answer with any legal move, so all children are expanded, not just
+    # the book move.
+    actions = Action()
+    result = Result()
+    engine = Expectiminimax(max_depth=depth, verbose=False)
+    entries = {}
+
+    # Frontiers hold interned states: a position reached through several move
+    # orders is one shared frozen instance, expanded once.
+    frontier = set()
+    for player in (Player.WHITE, Player.BLACK):
+        state = create_initial_state()
+        state.current_player = player
+        frontier.add(state.intern())
+
+    for ply in range(plies):
+        next_frontier = set()
+        for state in frontier:
+            for roll in ROLLS:
+                legal_moves = actions.available_actions(state, roll)
+                if legal_moves:
+                    action, value = engine.choose_move(state, roll)
+                    entries[(state.key, roll)] = (action, value)
+                for move in legal_moves or (None,):
+                    child = result.result(state, move)
+                    if not child.is_terminal():
+                        next_frontier.add(child.intern())
+        if verbose:
+            print(f"  ply {ply}: {len(frontier)} positions, {len(entries)} book entries")
+        frontier = next_frontier
+
+    with open(path, "wb") as out:
+        out.write(HEADER.pack(MAGIC, VERSION, depth, len(entries)))
+        for (key, roll), ((from_idx, to_idx), value) in sorted(entries.items()):
+            out.write(RECORD.pack(key, roll, from_idx, to_idx, value))
+    return len(entries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute AI moves for the first plies of a game.")
+    parser.add_argument("--output", default="opening.book")
+    parser.add_argument("--plies", type=int, default=2)
+    parser.add_argument("--depth", type=int, default=4)
+    args = parser.parse_args()
+
+    start = time.time()
+    count = build(args.output, args.plies, args.depth)
+    print(f"Wrote {count} book entries to {args.output} in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
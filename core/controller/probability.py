@@ -1,11 +1,12 @@
 import random
 
 class Probability:
-    def __init__(self):
+    def __init__(self, rng=None):
         self._rolls = [1, 2, 3, 4, 5]
+        self._random = rng if rng is not None else random
     def throw_sticks(self):
         
-        sticks = [random.choice([0, 1]) for _ in range(4)]
+        sticks = [self._random.choice([0, 1]) for _ in range(4)]
         white_faces = sum(sticks) 
         
         if white_faces == 1:
@@ -0,0 +1,226 @@
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class SearchStats:
+    # Outcome and counters of one Expectiminimax.choose_move or
+    # choose_moves_all_rolls call. The fields below `profiled` are only filled
+    # when the engine runs with a SearchProfiler.
+    # None for choose_moves_all_rolls.
+    roll: Optional[int]
+    max_depth: int
+    time_limit: Optional[float] = None
+    # "search", "book", "ponder", "no moves" or "all rolls".
+    source: str = "search"
+    best_action: Optional[tuple] = None
+    value: float = 0.0
+    completed_depth: int = 0
+    elapsed: float = 0.0
+    nodes: int = 0
+    tt_hits: int = 0
+    alpha_beta_cutoffs: int = 0
+    # Alpha-beta cutoffs caused by the first move tried, a measure of move ordering.
+    first_move_cutoffs: int = 0
+    star1_cutoffs: int = 0
+    star2_cutoffs: int = 0
+    star2_probes: int = 0
+    tt: dict = field(default_factory=dict)
+    # (action, value) per root move of the last completed iteration, in search order.
+    root_moves: list = field(default_factory=list)
+    # (depth, best action, value, nodes so far, seconds so far) per completed iteration.
+    iterations: list = field(default_factory=list)
+    # Roll -> (action, value) from choose_moves_all_rolls; `value` is then their expectation.
+    replies: dict = field(default_factory=dict)
+
+    profiled: bool = False
+    # Search depth -> {ply: nodes}, one table per iterative-deepening depth.
+    nodes_by_ply: dict = field(default_factory=dict)
+    chance_nodes: int = 0
+    max_nodes: int = 0
+    min_nodes: int = 0
+    moves_generated: int = 0
+    movegen_time: float = 0.0
+    apply_time: float = 0.0
+    eval_time: float = 0.0
+
+    @property
+    def nodes_per_sec(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        return self.first_move_cutoffs / self.alpha_beta_cutoffs if self.alpha_beta_cutoffs else 0.0
+
+    @property
+    def branching_factor(self) -> float:
+        # Legal moves per MAX/MIN node below the root.
+        decisions = self.max_nodes + self.min_nodes
+        return self.moves_generated / decisions if decisions else 0.0
+
+    def report(self) -> str:
+        if self.roll is None:
+            title = f"EXPECTIMINIMAX: All rolls, Depth={self.max_depth}"
+        elif self.time_limit is None:
+            title = f"EXPECTIMINIMAX: Roll={self.roll}, Depth={self.max_depth}"
+        else:
+            title = f"EXPECTIMINIMAX: Roll={self.roll}, Time limit={self.time_limit:.2f}s"
+        lines = ["=" * 60, title, "=" * 60]
+
+        if self.source in ("book", "ponder"):
+            label = "Book move" if self.source == "book" else "Pondered reply"
+            lines.append(f"{label}: {self.best_action} = {self.value:.2f} (depth {self.completed_depth})")
+            return "\n".join(lines + ["=" * 60])
+        if self.source == "no moves":
+            lines.append(f"No legal moves, pass = {self.value:.2f}")
+            return "\n".join(lines + ["=" * 60])
+
+        if self.source == "all rolls":
+            for roll, (action, value) in self.replies.items():
+                lines.append(f"  roll {roll}: {action} = {value:.2f}")
+            lines.append(f"Expected value: {self.value:.2f} (depth {self.completed_depth})")
+        else:
+            for i, (action, value) in enumerate(self.root_moves, 1):
+                status = " (best)" if action == self.best_action else ""
+                lines.append(f"  [{i}] {action[0]}→{action[1]}: {value:.2f}{status}")
+            if len(self.iterations) > 1:
+                for depth, action, value, nodes, seconds in self.iterations:
+                    lines.append(f"  depth {depth}: {action} = {value:.2f} ({nodes} nodes, {seconds:.3f}s)")
+            lines.append(f"Chosen action: {self.best_action} = {self.value:.2f} (depth {self.completed_depth})")
+        lines.append(f"Total nodes explored: {self.nodes} | TT Hits: {self.tt_hits} | "
+                     f"{self.nodes_per_sec:.0f} nodes/s")
+        lines.append(f"Cutoffs: alpha-beta {self.alpha_beta_cutoffs} "
+                     f"({self.first_move_cutoff_rate:.1%} on first move) | Star1 {self.star1_cutoffs} | "
+                     f"Star2 {self.star2_cutoffs}/{self.star2_probes} probes")
+        if self.tt:
+            lines.append(f"TT hit rate: {self.tt['hit_rate']:.1%} | Collisions: {self.tt['collisions']} | "
+                         f"Occupancy: {self.tt['occupancy']:.1%}")
+        if self.profiled:
+            for depth, counts in self.nodes_by_ply.items():
+                plies = ", ".join(f"{ply}: {count}" for ply, count in sorted(counts.items()))
+                lines.append(f"Nodes by ply, depth {depth}: {plies}")
+            lines.append(f"Chance {self.chance_nodes} | Max {self.max_nodes} | Min {self.min_nodes} | "
+                         f"Branching factor {self.branching_factor:.2f}")
+            other = self.elapsed - self.movegen_time - self.apply_time - self.eval_time
+            lines.append(f"Time: movegen {self.movegen_time:.4f}s | apply/undo {self.apply_time:.4f}s | "
+                         f"eval {self.eval_time:.4f}s | search {other:.4f}s")
+        lines.append(f"Time taken: {self.elapsed:.4f} seconds")
+        lines.append("=" * 60)
+        return "\n".join(lines)
+
+
+class SearchProfiler:
+    # Detailed counters for one engine. `install` replaces the engine's hooks
+    # with counting and timing wrappers on that instance only, so an engine
+    # created without a profiler runs the plain methods. The timings include
+    # the wrappers' own overhead. Searches run in pool workers are not profiled.
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.nodes_by_ply = defaultdict(Counter)
+        self.chance_nodes = 0
+        self.max_nodes = 0
+        self.min_nodes = 0
+        self.moves_generated = 0
+        self.movegen_time = 0.0
+        self.apply_time = 0.0
+        self.eval_time = 0.0
+
+    def fill(self, stats: SearchStats) -> None:
+        stats.profiled = True
+        stats.nodes_by_ply = {depth: dict(counts) for depth, counts in sorted(self.nodes_by_ply.items())}
+        stats.chance_nodes = self.chance_nodes
+        stats.max_nodes = self.max_nodes
+        stats.min_nodes = self.min_nodes
+        stats.moves_generated = self.moves_generated
+        stats.movegen_time = self.movegen_time
+        stats.apply_time = self.apply_time
+        stats.eval_time = self.eval_time
+
+    def install(self, engine) -> None:
+        clock = time.perf_counter
+        profiler = self
+
+        available_actions = engine.actions.available_actions
+        apply = engine.result.apply
+        undo = engine.result.undo
+        evaluate = engine._evaluate
+        evaluate_positions = engine._evaluate_positions
+        expectiminimax = engine._expectiminimax
+        chance_node = engine._chance_node
+        frontier_node = engine._frontier_node
+        max_node = engine._max_node
+        min_node = engine._min_node
+
+        def timed_available_actions(state, roll):
+            start = clock()
+            moves = available_actions(state, roll)
+            profiler.movegen_time += clock() - start
+            return moves
+
+        def timed_apply(state, action):
+            start = clock()
+            record = apply(state, action)
+            profiler.apply_time += clock() - start
+            return record
+
+        def timed_undo(state, record):
+            start = clock()
+            undo(state, record)
+            profiler.apply_time += clock() - start
+
+        def timed_evaluate(state):
+            start = clock()
+            value = evaluate(state)
+            profiler.eval_time += clock() - start
+            return value
+
+        def timed_evaluate_positions(positions):
+            start = clock()
+            values = evaluate_positions(positions)
+            profiler.eval_time += clock() - start
+            return values
+
+        def counted_expectiminimax(state, depth, is_max_player, alpha, beta):
+            root_depth = engine._root_depth
+            profiler.nodes_by_ply[root_depth][root_depth - depth] += 1
+            return expectiminimax(state, depth, is_max_player, alpha, beta)
+
+        def counted_chance_node(*args):
+            profiler.chance_nodes += 1
+            return chance_node(*args)
+
+        def counted_frontier_node(*args):
+            # Its children are scored in a batch without going through
+            # _expectiminimax; they sit on the last ply.
+            profiler.chance_nodes += 1
+            nodes = engine.nodes_explored
+            value = frontier_node(*args)
+            root_depth = engine._root_depth
+            profiler.nodes_by_ply[root_depth][root_depth] += engine.nodes_explored - nodes
+            return value
+
+        def counted_max_node(state, legal_moves, *args):
+            profiler.max_nodes += 1
+            profiler.moves_generated += len(legal_moves)
+            return max_node(state, legal_moves, *args)
+
+        def counted_min_node(state, legal_moves, *args):
+            profiler.min_nodes += 1
+            profiler.moves_generated += len(legal_moves)
+            return min_node(state, legal_moves, *args)
+
+        engine.actions.available_actions = timed_available_actions
+        engine.result.apply = timed_apply
+        engine.result.undo = timed_undo
+        engine._evaluate = timed_evaluate
+        engine._evaluate_positions = timed_evaluate_positions
+        engine._expectiminimax = counted_expectiminimax
+        engine._chance_node = counted_chance_node
+        engine._frontier_node = counted_frontier_node
+        engine._max_node = counted_max_node
+        engine._min_node = counted_min_node
@@ -0,0 +1,202 @@
+import argparse
+import mmap
+import struct
+import sys
+import time
+from array import array
+from itertools import combinations
+from math import comb
+from typing import Optional
+
+from core.actions import Action, ROLLS
+from core.component.bitboard import BOARD_SIZE
+from core.component.player import Player
+from core.controller.heuristic import MAX_SCORE, MIN_SCORE
+from core.controller.probability import Probability
+from core.results import Result
+from core.states import BLACK_SIDE, SenetState
+
+# File layout (little endian):
+#   header     magic, version, max_pieces, number of classes
+#   directory  per (white count, black count) class: counts and byte offset of its values
+#   values     float32 per position, at the offset given by _index
+MAGIC = b"SNTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHBB")
+DIRECTORY_ENTRY = struct.Struct("<BBQ")
+VALUE = struct.Struct("<f")
+
+# COMBINATIONS[n][k] == comb(n, k) for ranking piece sets.
+COMBINATIONS = tuple(tuple(comb(n, k) for k in range(8)) for n in range(BOARD_SIZE + 1))
+
+
+def _rank(mask: int) -> int:
+    # Position of the piece set in colexicographic order among sets of the same size.
+    rank = 0
+    k = 0
+    while mask:
+        low = mask & -mask
+        k += 1
+        rank += COMBINATIONS[low.bit_length() - 1][k]
+        mask ^= low
+    return rank
+
+
+def _class_size(white_count: int, black_count: int) -> int:
+    return COMBINATIONS[BOARD_SIZE][white_count] * COMBINATIONS[BOARD_SIZE][black_count] * 2
+
+
+def _index(white: int, black: int, black_to_move: bool) -> int:
+    black_sets = COMBINATIONS[BOARD_SIZE][black.bit_count()]
+    return (_rank(white) * black_sets + _rank(black)) * 2 + black_to_move
+
+
+def piece_classes(max_pieces: int) -> list[tuple[int, int]]:
+    # Smaller classes first: a class only depends on itself and on classes
+    # with one piece fewer (a piece leaving the board).
+    return [
+        (white_count, total - white_count)
+        for total in range(2, max_pieces + 1)
+        for white_count in range(1, total)
+        if white_count <= 7 and total - white_count <= 7
+    ]
+
+
+class EndgameTablebase:
+    # Exact expected scores (MAX_SCORE for a certain White win, MIN_SCORE for a
+    # certain Black win) of positions with few pieces left, read from a
+    # memory-mapped file written by `build`. Goal counts do not change who wins,
+    # so they are not part of the index.
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_pieces, classes = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} endgame tablebase")
+
+        self._offsets = {}
+        for i in range(classes):
+            white_count, black_count, offset = DIRECTORY_ENTRY.unpack_from(
+                self._map, HEADER.size + i * DIRECTORY_ENTRY.size)
+            self._offsets[(white_count, black_count)] = offset
+        self.hits = 0
+
+    def probe(self, state: SenetState) -> Optional[float]:
+        white = state.white
+        black = state.black
+        if (white | black).bit_count() > self.max_pieces:
+            return None
+        offset = self._offsets.get((white.bit_count(), black.bit_count()))
+        if offset is None:
+            return None
+        self.hits += 1
+        index = _index(white, black, state.side == BLACK_SIDE)
+        return VALUE.unpack_from(self._map, offset + index * VALUE.size)[0]
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+def _positions(white_count: int, black_count: int):
+    for white_squares in combinations(range(BOARD_SIZE), white_count):
+        white = sum(1 << pos for pos in white_squares)
+        free = [pos for pos in range(BOARD_SIZE) if not white >> pos & 1]
+        for black_squares in combinations(free, black_count):
+            yield white, sum(1 << pos for pos in black_squares)
+
+
+def _solve_class(white_count: int, black_count: int, solved: dict, tolerance: float,
+                 max_sweeps: int, verbose: bool) -> list:
+    actions = Action()
+    result = Result()
+    probabilities = [Probability().get_probability(roll) for roll in ROLLS]
+    values = [0.0] * _class_size(white_count, black_count)
+
+    # For every position and roll: the best value among children outside this
+    # class (settled already), and the indices of children inside it.
+    nodes = []
+    for white, black in _positions(white_count, black_count):
+        for player in (Player.WHITE, Player.BLACK):
+            state = SenetState(white=white, black=black, current_player=player)
+            maximize = player == Player.WHITE
+            rolls = []
+            for roll in ROLLS:
+                settled = None
+                inner = []
+                for move in actions.available_actions(state, roll) or (None,):
+                    undo = result.apply(state, move)
+                    if not state.white:
+                        value = MAX_SCORE
+                    elif not state.black:
+                        value = MIN_SCORE
+                    elif (state.white.bit_count(), state.black.bit_count()) != (white_count, black_count):
+                        value = solved[(state.white.bit_count(), state.black.bit_count())][
+                            _index(state.white, state.black, state.side == BLACK_SIDE)]
+                    else:
+                        inner.append(_index(state.white, state.black, state.side == BLACK_SIDE))
+                        value = None
+                    result.undo(state, undo)
+                    if value is not None and (settled is None or (value > settled if maximize else value < settled)):
+                        settled = value
+                rolls.append((settled, tuple(inner)))
+            nodes.append((_index(white, black, player == Player.BLACK), maximize, rolls))
+
+    # Gauss-Seidel value iteration over the roll distribution; cycles (swaps,
+    # the House of Water, passes) make a single backward pass impossible.
+    for sweep in range(1, max_sweeps + 1):
+        change = 0.0
+        for index, maximize, rolls in nodes:
+            expected = 0.0
+            for probability, (settled, inner) in zip(probabilities, rolls):
+                candidates = [values[i] for i in inner]
+                if settled is not None:
+                    candidates.append(settled)
+                expected += probability * (max(candidates) if maximize else min(candidates))
+            change = max(change, abs(expected - values[index]))
+            values[index] = expected
+        if change < tolerance:
+            break
+
+    if verbose:
+        print(f"  class {white_count}W/{black_count}B: {len(nodes)} positions, {sweep} sweeps, last change {change:.2e}")
+    return values
+
+
+def build(path: str, max_pieces: int = 3, tolerance: float = 1e-3, max_sweeps: int = 10000,
+          verbose: bool = True) -> None:
+    solved = {}
+    for white_count, black_count in piece_classes(max_pieces):
+        solved[(white_count, black_count)] = _solve_class(
+            white_count, black_count, solved, tolerance, max_sweeps, verbose)
+
+    classes = piece_classes(max_pieces)
+    offset = HEADER.size + len(classes) * DIRECTORY_ENTRY.size
+    with open(path, "wb") as out:
+        out.write(HEADER.pack(MAGIC, VERSION, max_pieces, len(classes)))
+        for white_count, black_count in classes:
+            out.write(DIRECTORY_ENTRY.pack(white_count, black_count, offset))
+            offset += len(solved[(white_count, black_count)]) * VALUE.size
+        for key in classes:
+            values = array("f", solved[key])
+            if sys.byteorder != "little":
+                values.byteswap()
+            values.tofile(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Solve Senet endgames by value iteration.")
+    parser.add_argument("--output", default="endgame.tb")
+    parser.add_argument("--max-pieces", type=int, default=3, help="total pieces left on the board")
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    start = time.time()
+    build(args.output, args.max_pieces, args.tolerance)
+    print(f"Wrote {args.output} in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
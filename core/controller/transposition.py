@@ -0,0 +1,89 @@
+from typing import Optional
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class TranspositionTable:
+    # Fixed number of two-slot buckets: slot 0 keeps the deepest entry seen for
+    # the bucket, slot 1 always takes the newest one that did not go to slot 0.
+    # A separate always-replace array per bucket keeps the best move found for
+    # a (position, roll) decision, for move ordering.
+
+    def __init__(self, capacity: int = 1 << 18):
+        buckets = 1
+        while buckets * 2 < capacity:
+            buckets *= 2
+        self.capacity = buckets * 2
+        self._mask = buckets - 1
+        self.clear()
+
+    def clear(self) -> None:
+        self._keys: list[Optional[int]] = [None] * self.capacity
+        self._depths = [-1] * self.capacity
+        self._values = [0.0] * self.capacity
+        self._flags = [EXACT] * self.capacity
+        self._move_keys: list[Optional[int]] = [None] * (self._mask + 1)
+        self._moves: list[Optional[tuple]] = [None] * (self._mask + 1)
+        self.filled = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def probe(self, key: int, depth: int, alpha: float, beta: float) -> Optional[float]:
+        # Returns a stored value only if it settles the node for the (alpha, beta) window.
+        self.probes += 1
+        slot = (key & self._mask) << 1
+        for slot in (slot, slot + 1):
+            if self._keys[slot] != key or self._depths[slot] != depth:
+                continue
+            value = self._values[slot]
+            flag = self._flags[slot]
+            if flag == EXACT or (flag == LOWER_BOUND and value >= beta) or (flag == UPPER_BOUND and value <= alpha):
+                self.hits += 1
+                return value
+        return None
+
+    def store(self, key: int, depth: int, value: float, flag: int = EXACT) -> None:
+        self.stores += 1
+        slot = (key & self._mask) << 1
+        if depth < self._depths[slot]:
+            slot += 1
+
+        old_key = self._keys[slot]
+        if old_key is None:
+            self.filled += 1
+        elif old_key != key:
+            self.collisions += 1
+
+        self._keys[slot] = key
+        self._depths[slot] = depth
+        self._values[slot] = value
+        self._flags[slot] = flag
+
+    def probe_move(self, key: int) -> Optional[tuple]:
+        slot = key & self._mask
+        return self._moves[slot] if self._move_keys[slot] == key else None
+
+    def store_move(self, key: int, move: tuple) -> None:
+        slot = key & self._mask
+        self._move_keys[slot] = key
+        self._moves[slot] = move
+
+    def occupancy(self) -> float:
+        return self.filled / self.capacity
+
+    def stats(self) -> dict:
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "occupancy": self.occupancy(),
+        }
@@ -0,0 +1,251 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from core.component.player import Player
+from core.results import Result
+from core.states import PLAYERS, SenetState, create_initial_state
+
+# File layout (little endian): header, then games back to back. A game is a
+# game header, the start position, one 16-bit word per ply and, every
+# `snapshot_interval` plies, the position after that ply:
+#
+#   ply word:  bits 0-2 roll, bits 3-7 from, bits 8-13 to (30 bears off); a pass is from = to = PASS
+#   position:  white and black bitboards, then side to move (bit 0) and the
+#              white (bits 1-3) and black (bits 4-6) goal counts
+#
+# The size of a game follows from its header, so a scan can hop from game to
+# game without decoding the plies.
+MAGIC = b"SNGR"
+VERSION = 2
+# Version 1 stored snapshot_interval in one byte and a zero pad byte, which
+# reads the same through this layout, so both versions are accepted.
+HEADER = struct.Struct("<4sHH")
+READABLE_VERSIONS = (1, VERSION)
+MAX_SNAPSHOT_INTERVAL = 0xFFFF
+GAME = struct.Struct("<IB")
+POSITION = struct.Struct("<IIB")
+PLY = struct.Struct("<H")
+PASS = 31
+NO_WINNER = 255
+SNAPSHOT_INTERVAL = 32
+
+
+def pack_position(state: SenetState) -> bytes:
+    flags = state.side | state.white_goal_count << 1 | state.black_goal_count << 4
+    return POSITION.pack(state.white, state.black, flags)
+
+
+def unpack_position(buffer, offset: int) -> SenetState:
+    white, black, flags = POSITION.unpack_from(buffer, offset)
+    return SenetState(white=white, black=black, current_player=PLAYERS[flags & 1],
+                      white_goal_count=flags >> 1 & 7, black_goal_count=flags >> 4 & 7)
+
+
+def _game_size(plies: int, snapshot_interval: int) -> int:
+    snapshots = plies // snapshot_interval if snapshot_interval else 0
+    return GAME.size + POSITION.size + plies * PLY.size + snapshots * POSITION.size
+
+
+class GameRecordWriter:
+
+    def __init__(self, path: str, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        if not 0 <= snapshot_interval <= MAX_SNAPSHOT_INTERVAL:
+            raise ValueError(f"snapshot_interval must be from 0 to {MAX_SNAPSHOT_INTERVAL}, got {snapshot_interval}")
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self.games = 0
+        self._result = Result()
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, snapshot_interval))
+
+    def write(self, moves: Iterable[tuple[int, Optional[tuple[int, int]]]],
+              start: Optional[SenetState] = None) -> SenetState:
+        # `moves` are (roll, action) pairs played from `start` (the initial
+        # position with White to move by default); an action of None is a
+        # pass. The winner is read off the final position, which is returned.
+        start = start.copy() if start is not None else create_initial_state()
+        state = start.copy()
+        plies = bytearray()
+        snapshots = bytearray()
+        for ply, (roll, action) in enumerate(moves, 1):
+            from_idx, to_idx = action if action is not None else (PASS, PASS)
+            plies += PLY.pack(roll | from_idx << 3 | to_idx << 8)
+            self._result.apply(state, action)
+            if self.snapshot_interval and ply % self.snapshot_interval == 0:
+                snapshots += pack_position(state)
+
+        winner = state.get_winner()
+        winner_code = PLAYERS.index(winner) if winner is not None else NO_WINNER
+        self._file.write(GAME.pack(len(plies) // PLY.size, winner_code))
+        self._file.write(pack_position(start))
+        self._file.write(plies)
+        self._file.write(snapshots)
+        self.games += 1
+        return state
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "GameRecordWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class GameRecord:
+    # A view of one game in a mapped file; nothing is decoded until asked for.
+    __slots__ = ("_buffer", "_offset", "_snapshot_interval", "plies", "winner")
+
+    def __init__(self, buffer, offset: int, snapshot_interval: int):
+        self._buffer = buffer
+        self._offset = offset
+        self._snapshot_interval = snapshot_interval
+        self.plies, winner = GAME.unpack_from(buffer, offset)
+        self.winner = PLAYERS[winner] if winner != NO_WINNER else None
+
+    @property
+    def start(self) -> SenetState:
+        return unpack_position(self._buffer, self._offset + GAME.size)
+
+    def moves(self, first: int = 0) -> Iterator[tuple[int, Optional[tuple[int, int]]]]:
+        # (roll, action) per ply from ply `first` on; a pass has action None.
+        begin = self._offset + GAME.size + POSITION.size
+        words = self._buffer[begin + first * PLY.size:begin + self.plies * PLY.size]
+        for (word,) in PLY.iter_unpack(words):
+            from_idx = word >> 3 & 31
+            yield word & 7, (from_idx, word >> 8) if from_idx != PASS else None
+
+    def replay(self) -> Iterator[tuple[int, Optional[tuple[int, int]], SenetState]]:
+        # (roll, action, position after the ply) for every ply, each position a new state.
+        result = Result()
+        state = self.start
+        for roll, action in self.moves():
+            state = result.result(state, action)
+            yield roll, action, state
+
+    def state_at(self, ply: int) -> SenetState:
+        # The position after `ply` plies (0 is the start), replayed from the
+        # nearest snapshot at or before it.
+        if not 0 <= ply <= self.plies:
+            raise IndexError(f"ply {ply} out of range 0..{self.plies}")
+        snapshot = ply // self._snapshot_interval if self._snapshot_interval else 0
+        if snapshot:
+            state = unpack_position(self._buffer, self._offset + GAME.size + POSITION.size
+                                    + self.plies * PLY.size + (snapshot - 1) * POSITION.size)
+            first = snapshot * self._snapshot_interval
+        else:
+            state = self.start
+            first = 0
+        result = Result()
+        for _, action in islice(self.moves(first), ply - first):
+            result.apply(state, action)
+        return state
+
+
+class GameRecordReader:
+    # Maps a record file read-only. Iterating streams the games in order; len()
+    # and indexing build an offset index on first use, one hop per game.
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.snapshot_interval = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version not in READABLE_VERSIONS:
+            raise ValueError(f"{path} is not a version {VERSION} game record file")
+        self._offsets: Optional[array] = None
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        offset = HEADER.size
+        end = len(self._map)
+        while offset < end:
+            game = GameRecord(self._map, offset, self.snapshot_interval)
+            yield game
+            offset += _game_size(game.plies, self.snapshot_interval)
+
+    def _index(self) -> array:
+        if self._offsets is None:
+            self._offsets = array("q")
+            offset = HEADER.size
+            end = len(self._map)
+            while offset < end:
+                self._offsets.append(offset)
+                offset += _game_size(GAME.unpack_from(self._map, offset)[0], self.snapshot_interval)
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def __getitem__(self, index: int) -> GameRecord:
+        return GameRecord(self._map, self._index()[index], self.snapshot_interval)
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "GameRecordReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def convert_selfplay(source: str, path: str, snapshot_interval: int = SNAPSHOT_INTERVAL) -> int:
+    # Games in the JSONL format of core.selfplay, in file order.
+    with open(source) as lines, GameRecordWriter(path, snapshot_interval) as writer:
+        for line in lines:
+            if not line.strip():
+                continue
+            game = json.loads(line)
+            start = create_initial_state()
+            start.current_player = Player(game["first"])
+            writer.write(((roll, (from_idx, to_idx) if from_idx >= 0 else None)
+                          for roll, from_idx, to_idx, *_ in game["moves"]), start)
+        return writer.games
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert self-play games to binary records, or scan a record file.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    convert = subcommands.add_parser("convert", help="convert core.selfplay JSONL output")
+    convert.add_argument("source")
+    convert.add_argument("output")
+    convert.add_argument("--snapshot-interval", type=int, default=SNAPSHOT_INTERVAL,
+                         help="plies between stored positions, 0 for none")
+    scan = subcommands.add_parser("scan", help="replay every game and print totals")
+    scan.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        if not 0 <= args.snapshot_interval <= MAX_SNAPSHOT_INTERVAL:
+            parser.error(f"--snapshot-interval must be from 0 to {MAX_SNAPSHOT_INTERVAL}")
+        games = convert_selfplay(args.source, args.output, args.snapshot_interval)
+        print(f"Wrote {games} games to {args.output}")
+        return
+
+    start = time.perf_counter()
+    games = plies = 0
+    wins = {Player.WHITE: 0, Player.BLACK: 0, None: 0}
+    with GameRecordReader(args.path) as reader:
+        for game in reader:
+            for _ in game.replay():
+                plies += 1
+            games += 1
+            wins[game.winner] += 1
+    size = os.path.getsize(args.path)
+    seconds = time.perf_counter() - start
+    print(f"{games} games, {plies} plies, {size} bytes ({size / max(plies, 1):.2f} bytes/ply)")
+    print(f"Replayed in {seconds:.2f}s ({plies / seconds if seconds else 0:.0f} plies/sec)")
+    print(f"White {wins[Player.WHITE]} | Black {wins[Player.BLACK]} | unfinished {wins[None]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,76 @@
+from typing import Optional
+
 from core.component.main_house import *
+from core.component.bitboard import rebirth_square
+from core.component.zobrist import BLACK_SQUARE_KEYS, BLACK_TO_MOVE_KEY, WHITE_SQUARE_KEYS, squares_key
 from core.states import SenetState
 from core.component.player import Player
 
 
+HOUSES_SENDING_BACK = (HOUSE_OF_HORUS, HOUSE_OF_THREE_TRUTHS, HOUSE_OF_RE_ATOUM)
+
+
 class Result:
     def _is_empty(self, cell) -> bool:
         return cell  == Player.EMPTY.value
 
 
-    def _send_to_rebirth(self, state: SenetState, piece_symbol: object) -> None:
-        rebirth_idx = HOUSE_OF_REBIRTH
-
-        if self._is_empty(state.board[rebirth_idx]):
-            state.board[rebirth_idx] = piece_symbol
-            return
+    def _send_to_rebirth(self, own: int, opponent: int) -> int:
+        target = rebirth_square(own | opponent)
+        if target is None:
+            return own
+        return own | (1 << target)
 
-        for i in range(rebirth_idx - 1, -1, -1):
-            if self._is_empty(state.board[i]):
-                state.board[i] = piece_symbol
-                return
 
-
-    def result(self, state: SenetState, action: tuple[int, int]) -> SenetState:
+    def result(self, state: SenetState, action: Optional[tuple[int, int]]) -> SenetState:
         new_state = state.copy()
-        new_state.last_action = action
-        board = new_state.board
-
-        piece = new_state.current_player.value
-        start_idx, end_idx = action
-
-        if end_idx >= 30:
-            board[start_idx] = Player.EMPTY.value
-            new_state.add_piece_to_goal(new_state.current_player)
-        elif not self._is_empty(board[end_idx]):
-            temp =board[end_idx]
-            board[end_idx] =board[start_idx]
-            board[start_idx] =temp
-        else:
-            board[end_idx] = piece
-            board[start_idx] = Player.EMPTY.value
-
-        for house_idx in [HOUSE_OF_HORUS, HOUSE_OF_THREE_TRUTHS, HOUSE_OF_RE_ATOUM]:
-            if board[house_idx] == piece and start_idx!=house_idx and end_idx!=house_idx:
-                board[house_idx] = Player.EMPTY.value
-                self._send_to_rebirth(new_state, piece)
-
-        new_state.current_player = new_state.current_player.opponent()
+        self.apply(new_state, action)
         return new_state
+
+
+    def apply(self, state: SenetState, action: Optional[tuple[int, int]]) -> tuple:
+        # Plays `action` in place (`None` passes the turn) and returns the record `undo` restores from.
+        undo = (state.white, state.black, state.white_goal_count, state.black_goal_count, state.last_action,
+                state.key, state.side)
+
+        if action is not None:
+            state.last_action = action
+
+            is_white = not state.side
+            own, opponent = (state.white, state.black) if is_white else (state.black, state.white)
+            start_idx, end_idx = action
+            start_bit = 1 << start_idx
+
+            if end_idx >= 30:
+                own &= ~start_bit
+                state.add_piece_to_goal(state.current_player)
+            else:
+                end_bit = 1 << end_idx
+                if opponent & end_bit:
+                    own = (own & ~start_bit) | end_bit
+                    opponent = (opponent & ~end_bit) | start_bit
+                elif not own & end_bit:
+                    own = (own & ~start_bit) | end_bit
+
+            for house_idx in HOUSES_SENDING_BACK:
+                house_bit = 1 << house_idx
+                if own & house_bit and start_idx != house_idx and end_idx != house_idx:
+                    own = self._send_to_rebirth(own & ~house_bit, opponent)
+
+            if is_white:
+                white, black = own, opponent
+            else:
+                white, black = opponent, own
+
+            state.key ^= (squares_key(state.white ^ white, WHITE_SQUARE_KEYS)
+                          ^ squares_key(state.black ^ black, BLACK_SQUARE_KEYS))
+            state.white, state.black = white, black
+
+        state.side ^= 1
+        state.key ^= BLACK_TO_MOVE_KEY
+        return undo
+
+
+    def undo(self, state: SenetState, undo: tuple) -> None:
+        (state.white, state.black, state.white_goal_count, state.black_goal_count, state.last_action,
+         state.key, state.side) = undo
@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Optional
+
+from core.component.player import Player
+from core.controller import heuristic
+from core.controller.expectiminimax import Expectiminimax
+from core.controller.probability import Probability
+from core.controller.tablebase import EndgameTablebase
+from core.results import Result
+from core.states import create_initial_state
+
+MAX_PLIES = 2000
+IN_FLIGHT_PER_WORKER = 4
+
+# One engine per (depth, time limit, tablebase) in each process, kept between
+# games so the transposition table stays warm. A side playing with its own
+# heuristic weights gets its own engine, so switching weights between moves
+# does not clear the other side's table.
+_engines = {}
+
+
+def _engine(depth: int, time_limit: Optional[float], tablebase_path: Optional[str],
+            side: Optional[Player] = None) -> Expectiminimax:
+    key = (depth, time_limit, tablebase_path, side)
+    if key not in _engines:
+        tablebase = EndgameTablebase(tablebase_path) if tablebase_path else None
+        _engines[key] = Expectiminimax(max_depth=depth, verbose=False, time_limit=time_limit,
+                                       tablebase=tablebase)
+    return _engines[key]
+
+
+def play_game(seed: int, white_depth: int = 2, black_depth: int = 2, time_limit: Optional[float] = None,
+              max_plies: int = MAX_PLIES, tablebase_path: Optional[str] = None,
+              white_weights: Optional[tuple] = None, black_weights: Optional[tuple] = None) -> dict:
+    # The seed fixes the starting side and every stick throw, so a game is
+    # reproducible as long as the search is not cut short by a time limit.
+    # A side with weights searches with those heuristic weights, the other
+    # with the weights set in the process when the game starts; those are
+    # set again when the game ends.
+    rng = random.Random(seed)
+    probability = Probability(rng)
+    result = Result()
+    engines = {
+        player: _engine(depth, time_limit, tablebase_path, player if weights is not None else None)
+        for player, depth, weights in ((Player.WHITE, white_depth, white_weights),
+                                       (Player.BLACK, black_depth, black_weights))
+    }
+    process_weights = heuristic.WEIGHTS
+    weights = {Player.WHITE: white_weights or process_weights, Player.BLACK: black_weights or process_weights}
+
+    state = create_initial_state()
+    state.current_player = Player.WHITE if rng.random() < 0.5 else Player.BLACK
+    first = state.current_player
+
+    # One [roll, from, to, nodes, microseconds] entry per ply; a pass is recorded with from = to = -1.
+    plies = []
+    start = time.perf_counter()
+    while not state.is_terminal() and len(plies) < max_plies:
+        roll = probability.throw_sticks()
+        engine = engines[state.current_player]
+        if weights[state.current_player] != heuristic.WEIGHTS:
+            heuristic.set_weights(weights[state.current_player])
+        move_start = time.perf_counter()
+        action, _ = engine.choose_move(state, roll)
+        elapsed = time.perf_counter() - move_start
+        result.apply(state, action)
+        from_idx, to_idx = action if action is not None else (-1, -1)
+        plies.append([roll, from_idx, to_idx, engine.nodes_explored, int(elapsed * 1e6)])
+
+    heuristic.set_weights(process_weights)
+
+    winner = state.get_winner()
+    return {
+        "seed": seed,
+        "first": first.value,
+        "winner": winner.value if winner is not None else None,
+        "plies": len(plies),
+        "nodes": sum(ply[3] for ply in plies),
+        "seconds": round(time.perf_counter() - start, 6),
+        "moves": plies,
+    }
+
+
+def run(games: int, output: str, seed: int = 0, workers: Optional[int] = None, white_depth: int = 2,
+        black_depth: int = 2, time_limit: Optional[float] = None, max_plies: int = MAX_PLIES,
+        tablebase_path: Optional[str] = None, report_every: int = 0,
+        white_weights: Optional[tuple] = None, black_weights: Optional[tuple] = None) -> dict:
+    # Games finish in any order; each JSON line carries its seed. At most a few
+    # games per worker are queued, so memory stays flat however many are asked for.
+    workers = workers or os.cpu_count() or 1
+    settings = (white_depth, black_depth, time_limit, max_plies, tablebase_path, white_weights, black_weights)
+    summary = {"games": 0, "plies": 0, "nodes": 0, "wins": {Player.WHITE.value: 0, Player.BLACK.value: 0, None: 0}}
+    start = time.perf_counter()
+
+    def record(game: dict) -> None:
+        out.write(json.dumps(game, separators=(",", ":")) + "\n")
+        summary["games"] += 1
+        summary["plies"] += game["plies"]
+        summary["nodes"] += game["nodes"]
+        summary["wins"][game["winner"]] += 1
+        if report_every and summary["games"] % report_every == 0:
+            print(f"  {summary['games']}/{games} games, "
+                  f"{summary['games'] / (time.perf_counter() - start):.2f} games/sec")
+
+    with open(output, "w") as out:
+        if workers <= 1:
+            for game_seed in range(seed, seed + games):
+                record(play_game(game_seed, *settings))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                seeds = iter(range(seed, seed + games))
+                pending = set()
+                while True:
+                    for game_seed in seeds:
+                        pending.add(pool.submit(play_game, game_seed, *settings))
+                        if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                            break
+                    if not pending:
+                        break
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        record(future.result())
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["games_per_sec"] = summary["games"] / summary["seconds"] if summary["seconds"] else 0.0
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play seeded AI-vs-AI games without the GUI.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--output", default="selfplay.jsonl")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game; game i uses seed + i")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    parser.add_argument("--white-depth", type=int, default=2)
+    parser.add_argument("--black-depth", type=int, default=2)
+    parser.add_argument("--time-limit", type=float, default=None, help="seconds per move instead of a fixed depth")
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES)
+    parser.add_argument("--tablebase", default=None)
+    parser.add_argument("--white-weights", default=None, help="heuristic weight file for White")
+    parser.add_argument("--black-weights", default=None, help="heuristic weight file for Black")
+    args = parser.parse_args()
+
+    white_weights = heuristic.read_weights(args.white_weights) if args.white_weights else None
+    black_weights = heuristic.read_weights(args.black_weights) if args.black_weights else None
+    summary = run(args.games, args.output, args.seed, args.workers, args.white_depth, args.black_depth,
+                  args.time_limit, args.max_plies, args.tablebase, report_every=max(1, args.games // 10),
+                  white_weights=white_weights, black_weights=black_weights)
+    wins = summary["wins"]
+    print(f"Wrote {summary['games']} games to {args.output} in {summary['seconds']:.1f}s "
+          f"({summary['games_per_sec']:.2f} games/sec, {summary['nodes']} nodes)")
+    print(f"White {wins[Player.WHITE.value]} | Black {wins[Player.BLACK.value]} | unfinished {wins[None]}")
+
+
+if __name__ == "__main__":
+    main()
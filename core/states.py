@@ -1,92 +1,200 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import weakref
 from typing import Optional
 
 from core.actions import Action
+from core.component.bitboard import BOARD_SIZE
 from core.component.player import Player
+from core.component.zobrist import (
+    BLACK_GOAL_KEYS,
+    BLACK_TO_MOVE_KEY,
+    WHITE_GOAL_KEYS,
+    position_key,
+)
 
 
-BOARD_SIZE = 30
 BOARD_COLS = 10
 
+# `side` values: the side to move is kept as a small int, current_player maps it to a Player.
+WHITE_SIDE = 0
+BLACK_SIDE = 1
+PLAYERS = (Player.WHITE, Player.BLACK)
+SIDES = {Player.WHITE: WHITE_SIDE, Player.BLACK: BLACK_SIDE}
+
 
-@dataclass
 class SenetState:
-    board: list[str]
-    current_player: Player = Player.WHITE
-    last_action: Optional[Action] = None
-    white_goal_count: int = 0
-    black_goal_count: int = 0
+    # Slotted, with the full Zobrist key kept up to date on every change
+    # (Result.apply does it incrementally), so hashing is an attribute read.
+    # freeze() gives an immutable copy and intern() a shared one per position.
+    __slots__ = ("white", "black", "side", "white_goal_count", "black_goal_count", "last_action", "key",
+                 "__weakref__")
+
+    def __init__(self, white: int, black: int, current_player: Player = Player.WHITE,
+                 last_action: Optional[Action] = None, white_goal_count: int = 0, black_goal_count: int = 0):
+        self.white = white
+        self.black = black
+        self.side = SIDES[current_player]
+        self.white_goal_count = white_goal_count
+        self.black_goal_count = black_goal_count
+        self.last_action = last_action
+        self.key = (position_key(white, black) ^ WHITE_GOAL_KEYS[white_goal_count]
+                    ^ BLACK_GOAL_KEYS[black_goal_count] ^ (BLACK_TO_MOVE_KEY if self.side else 0))
+
+    @classmethod
+    def from_board(cls, board: list[str], **kwargs) -> SenetState:
+        white = 0
+        black = 0
+        for idx, cell in enumerate(board):
+            if cell == Player.WHITE.value:
+                white |= 1 << idx
+            elif cell == Player.BLACK.value:
+                black |= 1 << idx
+        return cls(white=white, black=black, **kwargs)
+
+    def pack(self) -> tuple:
+        return (self.white, self.black, self.current_player.value, self.white_goal_count, self.black_goal_count)
+
+    @classmethod
+    def unpack(cls, packed: tuple) -> SenetState:
+        white, black, player, white_goal_count, black_goal_count = packed
+        return cls(white=white, black=black, current_player=Player(player),
+                   white_goal_count=white_goal_count, black_goal_count=black_goal_count)
+
+    @property
+    def current_player(self) -> Player:
+        return PLAYERS[self.side]
+
+    @current_player.setter
+    def current_player(self, player: Player) -> None:
+        side = SIDES[player]
+        if side != self.side:
+            self.side = side
+            self.key ^= BLACK_TO_MOVE_KEY
+
+    @property
+    def board(self) -> list[str]:
+        board = [Player.EMPTY.value] * BOARD_SIZE
+        for idx in range(BOARD_SIZE):
+            bit = 1 << idx
+            if self.white & bit:
+                board[idx] = Player.WHITE.value
+            elif self.black & bit:
+                board[idx] = Player.BLACK.value
+        return board
+
+    def pieces(self, player: Player) -> int:
+        return self.white if player == Player.WHITE else self.black
 
     def white_number(self) -> int:
-        return sum(1 for cell in self.board if cell == Player.WHITE.value)
+        return self.white.bit_count()
 
     def black_number(self) -> int:
-        return sum(1 for cell in self.board if cell == Player.BLACK.value)
+        return self.black.bit_count()
 
     def copy(self) -> SenetState:
-        return SenetState(
-            board=self.board[:],
-            current_player=self.current_player,
-            last_action=self.last_action,
-            white_goal_count=self.white_goal_count,
-            black_goal_count=self.black_goal_count,
-        )
+        # Always a mutable SenetState, also for frozen states.
+        state = _new_state(SenetState)
+        state.white = self.white
+        state.black = self.black
+        state.side = self.side
+        state.white_goal_count = self.white_goal_count
+        state.black_goal_count = self.black_goal_count
+        state.last_action = self.last_action
+        state.key = self.key
+        return state
+
+    def freeze(self) -> FrozenSenetState:
+        if type(self) is FrozenSenetState:
+            return self
+        state = _new_state(FrozenSenetState)
+        for name in _FIELDS:
+            object.__setattr__(state, name, getattr(self, name))
+        return state
+
+    def intern(self) -> FrozenSenetState:
+        # The one frozen instance of this position while any reference to it
+        # lives, so positions reached through different move orders share it.
+        state = _interned.get(self.key)
+        if state is None or state != self:
+            state = _interned[self.key] = self.freeze()
+        return state
 
     def add_piece_to_goal(self, player: Player) -> None:
         if player == Player.WHITE:
+            self.key ^= WHITE_GOAL_KEYS[self.white_goal_count] ^ WHITE_GOAL_KEYS[self.white_goal_count + 1]
             self.white_goal_count += 1
         else:
+            self.key ^= BLACK_GOAL_KEYS[self.black_goal_count] ^ BLACK_GOAL_KEYS[self.black_goal_count + 1]
             self.black_goal_count += 1
 
     def is_terminal(self) -> bool:
-        white_found = False
-        black_found = False
-        for cell in self.board:
-            if cell == Player.WHITE.value:
-                white_found = True
-                if black_found:
-                    return False
-            elif cell == Player.BLACK.value:
-                black_found = True
-                if white_found:
-                    return False
-        return True
+        return not (self.white and self.black)
 
     def get_winner(self) -> Optional[Player]:
         if not self.is_terminal():
             return None
+        # The first side to bear off all of its pieces wins.
         if self.white_number() == 0 and self.black_number() > 0:
-            return Player.BLACK
-        if self.black_number() == 0 and self.white_number() > 0:
             return Player.WHITE
+        if self.black_number() == 0 and self.white_number() > 0:
+            return Player.BLACK
         return None
 
     def __eq__(self, state: object) -> bool:
         if not isinstance(state, SenetState):
             return False
         return (
-            self.current_player == state.current_player
-            and self.board == state.board
+            self.white == state.white
+            and self.black == state.black
+            and self.side == state.side
             and self.white_goal_count == state.white_goal_count
             and self.black_goal_count == state.black_goal_count
         )
 
     def __hash__(self) -> int:
-        board_key = tuple(self.board)
-        return hash((board_key, self.current_player.value, self.white_goal_count, self.black_goal_count))
+        return self.key
+
+    def __reduce__(self):
+        # Pickle, copy and deepcopy rebuild the state through _restore, as
+        # frozen states refuse the attribute assignment they would use.
+        return _restore, (type(self), tuple(getattr(self, name) for name in _FIELDS))
+
+    def __repr__(self) -> str:
+        return (f"{type(self).__name__}(white={self.white:#x}, black={self.black:#x}, "
+                f"current_player={self.current_player}, white_goal_count={self.white_goal_count}, "
+                f"black_goal_count={self.black_goal_count})")
+
+
+class FrozenSenetState(SenetState):
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"cannot set {name!r} on a frozen state; copy() it first")
+
+
+_FIELDS = ("white", "black", "side", "white_goal_count", "black_goal_count", "last_action", "key")
+_new_state = object.__new__
+_interned: "weakref.WeakValueDictionary[int, FrozenSenetState]" = weakref.WeakValueDictionary()
+
+
+def _restore(cls: type, fields: tuple) -> SenetState:
+    state = _new_state(cls)
+    for name, value in zip(_FIELDS, fields):
+        object.__setattr__(state, name, value)
+    return state
 
 
 def create_initial_state() -> SenetState:
-    board: list[str] = [Player.EMPTY.value for _ in range(BOARD_SIZE)]
     white_positions = [0, 2, 4, 6, 8, 10, 12]
     black_positions = [1, 3, 5, 7, 9, 11, 13]
 
+    white = 0
     for idx in white_positions:
-        board[idx] = Player.WHITE.value
+        white |= 1 << idx
 
+    black = 0
     for idx in black_positions:
-        board[idx] = Player.BLACK.value
+        black |= 1 << idx
 
-    return SenetState(board=board, current_player=Player.WHITE)
+    return SenetState(white=white, black=black, current_player=Player.WHITE)
@@ -0,0 +1,193 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Sequence
+
+import numpy as np
+
+from core.component.player import Player
+from core.controller import batch_heuristic, heuristic
+from core.records import GameRecordReader
+from core.selfplay import play_game
+
+GAMES_PER_TASK = 256
+NEWTON_ITERATIONS = 25
+RIDGE = 1e-4
+
+# SPSA gains, in units of the starting weights: each iteration perturbs every
+# tuned weight by about SPSA_C of its value. The goal weight stays fixed
+# because scaling all weights together does not change any move.
+SPSA_A = 0.5
+SPSA_C = 0.2
+SPSA_STABILITY = 10
+
+
+def _extract_games(path: str, first: int, last: int, every: int) -> tuple:
+    # Features of every `every`-th non-terminal position of games first..last-1
+    # and whether White won each of those games. Unfinished games are skipped.
+    positions = []
+    labels = []
+    with GameRecordReader(path) as reader:
+        for index in range(first, last):
+            game = reader[index]
+            if game.winner is None:
+                continue
+            label = 1.0 if game.winner == Player.WHITE else 0.0
+            for ply, (_, _, state) in enumerate(game.replay(), 1):
+                if ply % every or state.is_terminal():
+                    continue
+                positions.append((state.white, state.black, state.white_goal_count, state.black_goal_count))
+                labels.append(label)
+    return batch_heuristic.features_positions(positions), np.asarray(labels, dtype=np.float64)
+
+
+def extract(paths: Sequence[str], every: int = 1, workers: Optional[int] = None) -> tuple:
+    # (N, 6) features and N outcomes from game record files, a block of games per task.
+    workers = workers or os.cpu_count() or 1
+    tasks = []
+    for path in paths:
+        with GameRecordReader(path) as reader:
+            games = len(reader)
+        tasks += [(path, first, min(first + GAMES_PER_TASK, games), every)
+                  for first in range(0, games, GAMES_PER_TASK)]
+
+    if workers <= 1:
+        parts = [_extract_games(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_extract_games, *zip(*tasks)))
+    if not parts:
+        return np.zeros((0, len(heuristic.WEIGHT_NAMES)), dtype=np.int64), np.zeros(0)
+    return np.concatenate([f for f, _ in parts]), np.concatenate([l for _, l in parts])
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -500, 500)))
+
+
+def log_loss(scores, labels, scale: float) -> float:
+    p = np.clip(_sigmoid(scores / scale), 1e-12, 1 - 1e-12)
+    return float(-np.mean(labels * np.log(p) + (1 - labels) * np.log(1 - p)))
+
+
+def _newton(features, labels, coefficients):
+    # Logistic regression without intercept: a draw-free game between equal
+    # sides is symmetric, so a score of 0 should mean even chances.
+    identity = np.eye(features.shape[1])
+    for _ in range(NEWTON_ITERATIONS):
+        p = _sigmoid(features @ coefficients)
+        gradient = features.T @ (p - labels) / len(labels) + RIDGE * coefficients
+        hessian = (features * (p * (1 - p))[:, None]).T @ features / len(labels) + RIDGE * identity
+        step = np.linalg.solve(hessian, gradient)
+        coefficients = coefficients - step
+        if np.max(np.abs(step)) < 1e-9:
+            break
+    return coefficients
+
+
+def texel(features, labels, initial: Sequence[float] = heuristic.DEFAULT_WEIGHTS) -> tuple:
+    # Texel tuning: the win probability of a position is taken to be
+    # sigmoid(score / scale). The scale is fitted for the initial weights and
+    # then held, so the tuned scores stay on the same scale; then all weights
+    # are fitted by logistic regression. Fitted weights that could reach
+    # MAX_SCORE are scaled back with heuristic.bounded_weights.
+    # Returns (weights, scale, loss before, loss after).
+    features = np.asarray(features, dtype=np.float64)
+    initial = np.asarray(initial, dtype=np.float64)
+    scores = features @ initial
+    inverse_scale = _newton(scores[:, None] / 1000.0, labels, np.ones(1))[0] / 1000.0
+    scale = 1.0 / inverse_scale
+
+    # Columns are normalised so the ridge term treats every weight alike.
+    norms = np.sqrt(np.mean(features ** 2, axis=0))
+    norms[norms == 0] = 1.0
+    coefficients = _newton(features / norms, labels, initial * norms / scale)
+    weights = np.asarray(heuristic.bounded_weights(coefficients / norms * scale), dtype=np.float64)
+    return weights, scale, log_loss(scores, labels, scale), log_loss(features @ weights, labels, scale)
+
+
+def _match(pool, plus: tuple, minus: tuple, seeds: range, depth: int) -> float:
+    # Score of `plus` against `minus` in [-1, 1], each seed played with both colours.
+    games = []
+    for seed in seeds:
+        games.append((pool.submit(play_game, seed, depth, depth, white_weights=plus, black_weights=minus), Player.WHITE))
+        games.append((pool.submit(play_game, seed, depth, depth, white_weights=minus, black_weights=plus), Player.BLACK))
+    score = 0
+    for future, plus_side in games:
+        winner = future.result()["winner"]
+        if winner is not None:
+            score += 1 if winner == plus_side.value else -1
+    return score / len(games)
+
+
+def spsa(iterations: int, games: int = 16, depth: int = 1, initial: Sequence[float] = heuristic.DEFAULT_WEIGHTS,
+         workers: Optional[int] = None, seed: int = 0, verbose: bool = True) -> tuple:
+    # Simultaneous perturbation: every iteration plays weights nudged up
+    # against weights nudged down along one random sign vector, on `games`
+    # seeds with both colours, and steps along the score. Candidates and the
+    # running estimate are kept inside the weights set_weights accepts.
+    # Returns the weights.
+    workers = workers or os.cpu_count() or 1
+    rng = np.random.default_rng(seed)
+    base = np.asarray(initial, dtype=np.float64)
+    theta = np.ones(len(base))
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for k in range(iterations):
+            c = SPSA_C / (k + 1) ** 0.101
+            a = SPSA_A / (k + 1 + SPSA_STABILITY) ** 0.602
+            delta = rng.choice((-1.0, 1.0), size=len(base))
+            delta[0] = 0.0
+            plus = heuristic.bounded_weights(base * (theta + c * delta))
+            minus = heuristic.bounded_weights(base * (theta - c * delta))
+            seeds = range(seed + k * games, seed + (k + 1) * games)
+            score = _match(pool, plus, minus, seeds, depth)
+            theta += a * score / (2 * c) * delta
+            bound = heuristic.score_bound(base * theta)
+            if bound >= heuristic.MAX_SCORE:
+                theta *= (heuristic.MAX_SCORE - 1) / bound
+            if verbose:
+                print(f"  iteration {k + 1}/{iterations}: score {score:+.3f}, weights "
+                      f"{heuristic.bounded_weights(base * theta)} ({time.perf_counter() - start:.0f}s)")
+    return heuristic.bounded_weights(base * theta)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tune the heuristic weights and write a weight file.")
+    subcommands = parser.add_subparsers(dest="method", required=True)
+    fit = subcommands.add_parser("texel", help="fit against the outcomes of recorded games")
+    fit.add_argument("records", nargs="+", help="game record files (see core.records)")
+    fit.add_argument("--every", type=int, default=1, help="use every n-th position of each game")
+    play = subcommands.add_parser("spsa", help="tune by self-play")
+    play.add_argument("--iterations", type=int, default=50)
+    play.add_argument("--games", type=int, default=16, help="seeds per iteration, each played with both colours")
+    play.add_argument("--depth", type=int, default=1)
+    play.add_argument("--seed", type=int, default=0)
+    for subcommand in (fit, play):
+        subcommand.add_argument("--initial", default=None, help="weight file to start from (default: built-in)")
+        subcommand.add_argument("--output", default="weights.json")
+        subcommand.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    initial = heuristic.read_weights(args.initial) if args.initial else heuristic.DEFAULT_WEIGHTS
+    start = time.perf_counter()
+    if args.method == "texel":
+        features, labels = extract(args.records, args.every, args.workers)
+        print(f"Extracted {len(labels)} positions in {time.perf_counter() - start:.1f}s")
+        weights, scale, before, after = texel(features, labels, initial)
+        print(f"Scale {scale:.1f} | log loss {before:.5f} -> {after:.5f}")
+        info = {"method": "texel", "positions": len(labels), "scale": round(scale, 3),
+                "loss_before": round(before, 6), "loss_after": round(after, 6)}
+    else:
+        weights = spsa(args.iterations, args.games, args.depth, initial, args.workers, args.seed)
+        info = {"method": "spsa", "iterations": args.iterations, "games": args.games, "depth": args.depth}
+
+    heuristic.save_weights(args.output, weights, **info)
+    print(", ".join(f"{name} {int(round(w))}" for name, w in zip(heuristic.WEIGHT_NAMES, weights)))
+    print(f"Wrote {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
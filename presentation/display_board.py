@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import pygame
 
 from core.actions import Action as RulesAction
 from core.controller.probability import Probability
-from core.controller.expectiminimax import Expectiminimax
+from core.controller.expectiminimax import Expectiminimax, SearchCancelled
+from core.controller.mcts import MCTS
 from core.results import Result
 from core.states import SenetState, create_initial_state
 from core.component.player import Player
@@ -17,6 +22,16 @@ from core.component.main_house import (
     HOUSE_OF_HORUS,
 )
 
+UI_SWITCH_INTERVAL = 0.001
+TEXT_CACHE_SIZE = 256
+# The loop sleeps in pygame.event.wait: one frame while the AI thinks (for the
+# progress line), otherwise up to a second, or until the search thread posts
+# SEARCH_DONE_EVENT.
+FRAME_MS = 1000 // 60
+IDLE_WAIT_MS = 1000
+SEARCH_DONE_EVENT = pygame.USEREVENT
+
+
 def rc_to_idx(row: int, col: int, cols: int = 10) -> int:
     col_in_row = (cols - 1 - col) if (row % 2 == 1) else col
     return row * cols + col_in_row
@@ -37,7 +52,8 @@ class UiConfig:
     top_bar: int = 220
 
 class DisplayBoard:
-    def __init__(self, state: SenetState | None = None, config: UiConfig | None = None) -> None:
+    def __init__(self, state: SenetState | None = None, config: UiConfig | None = None,
+                 controller: Expectiminimax | MCTS | None = None) -> None:
         self.config = config or UiConfig()
         self.state = state or create_initial_state()
         self.state.current_player = Player.BLACK
@@ -49,7 +65,22 @@ class DisplayBoard:
         self.ai_depth = 3
         self.game_mode = "human_vs_human"
         self.ai_player = Player.WHITE
-        self.controller = Expectiminimax(ui_callback=self._trigger_redraw, max_depth=self.ai_depth)
+        self.controller = controller or Expectiminimax(ui_callback=self._trigger_redraw, max_depth=self.ai_depth)
+        self.controller.set_ui_callback(self._trigger_redraw)
+        # Controllers without a depth limit (MCTS) report max_depth 0; they get
+        # no depth buttons.
+        self._depth_limited = bool(self.controller.max_depth)
+        if self._depth_limited:
+            self.ai_depth = self.controller.max_depth
+
+        # The AI searches on a worker thread so the window keeps handling events
+        # and redrawing; _poll_search applies the move once the future is done.
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._search: Future | None = None
+        self._search_started = 0.0
+        # While the human decides, the same thread ponders the AI's replies.
+        self.pondering = True
+        self._ponder: Future | None = None
 
         self.current_roll: int | None = None
         self.ai_roll: int | None = None
@@ -61,10 +92,23 @@ class DisplayBoard:
         
         self.last_move_from: int | None = None
         self.last_move_to: int | None = None
+        self.hover_idx: int | None = None
         
         self.screen = None
         self.font = None
         self.big_font = None
+        self._label_font: pygame.font.Font | None = None
+        self._small_font: pygame.font.Font | None = None
+        self._mode_font: pygame.font.Font | None = None
+        self._depth_font: pygame.font.Font | None = None
+        self._thinking_font: pygame.font.Font | None = None
+        self._roll_font: pygame.font.Font | None = None
+        self._text_cache: dict[tuple, pygame.Surface] = {}
+        self._static_layer: pygame.Surface | None = None
+        self._square_rects: list[tuple[int, pygame.Rect]] = []
+        # What each cell and the panels showed in the last presented frame.
+        self._shown_cells: list[tuple] | None = None
+        self._shown_panel: tuple | None = None
 
         self._btn_toss: pygame.Rect | None = None
         self._btn_ai: pygame.Rect | None = None
@@ -78,12 +122,71 @@ class DisplayBoard:
     def _trigger_redraw(self) -> None:
         self._needs_redraw = True
 
+    def _start_ai_turn(self) -> None:
+        self.last_move_from = None
+        self.last_move_to = None
+        self._start_search(self.prob.throw_sticks())
+
+    def _start_pondering(self) -> None:
+        if (self.pondering and hasattr(self.controller, "ponder") and self.winner is None
+                and self.game_mode == "human_vs_expectiminimax" and self.state.current_player != self.ai_player):
+            self._ponder = self._executor.submit(self.controller.ponder, self.state.copy(),
+                                                 generation=self.controller.generation)
+
+    def _stop_pondering(self) -> None:
+        if self._ponder is None:
+            return
+        if not self._ponder.cancel() and not self._ponder.done():
+            self.controller.cancel()
+        self._ponder = None
+
+    def _start_search(self, roll: int) -> None:
+        self._stop_pondering()
+        self.ai_roll = roll
+        self.ai_thinking = True
+        self._search_started = time.time()
+        # The generation is read here rather than in the worker, so a cancel()
+        # made before the search starts still reaches it.
+        self._search = self._executor.submit(self.controller.choose_move, self.state.copy(), roll,
+                                             generation=self.controller.generation)
+        if pygame.display.get_init():
+            self._search.add_done_callback(lambda _: pygame.event.post(pygame.event.Event(SEARCH_DONE_EVENT)))
+
+    def _poll_search(self) -> None:
+        if self._search is None or not self._search.done():
+            return
+        future, self._search = self._search, None
+        self.ai_roll = None
+        self.ai_thinking = False
+        try:
+            best_action, _ = future.result()
+        except SearchCancelled:
+            return
+
+        self.state = self.result.result(self.state, best_action)
+        if best_action:
+            self.last_move_from = best_action[0]
+            self.last_move_to = best_action[1]
+        self.current_roll = None
+        self.legal_moves = {}
+        if self.state.is_terminal():
+            self.winner = self.state.get_winner()
+        self._start_pondering()
+        self._trigger_redraw()
+
+    def _cancel_search(self) -> None:
+        if self._search is None:
+            return
+        self.controller.cancel()
+        self._search = None
+        self.ai_roll = None
+        self.ai_thinking = False
+
     def _roll_and_compute_moves(self) -> None:
         self.current_roll = self.prob.throw_sticks()
         self.legal_moves = {}
-        for move in self.rules.available_actions(self.state, self.current_roll):
-            for from_idx, to_idx in move.items():
-                self.legal_moves[int(from_idx)] = int(to_idx)
+        for from_idx, to_idx in self.rules.available_actions(self.state, self.current_roll):
+            self.legal_moves[from_idx] = to_idx
         
         self.last_move_from = None
         self.last_move_to = None
@@ -113,38 +216,36 @@ class DisplayBoard:
         if self._btn_mode and self._btn_mode.collidepoint(mouse_pos):
             if self.game_mode == "human_vs_human":
                 self.game_mode = "human_vs_expectiminimax"
+                self._start_pondering()
             else:
                 self.game_mode = "human_vs_human"
+                self._cancel_search()
+                self._stop_pondering()
             return
 
-        if self._btn_depth_minus and self._btn_depth_minus.collidepoint(mouse_pos):
+        if self._depth_limited and self._btn_depth_minus and self._btn_depth_minus.collidepoint(mouse_pos):
             if self.ai_depth > 1:
                 self.ai_depth -= 1
                 self.controller.max_depth = self.ai_depth
             return
 
-        if self._btn_depth_plus and self._btn_depth_plus.collidepoint(mouse_pos):
+        if self._depth_limited and self._btn_depth_plus and self._btn_depth_plus.collidepoint(mouse_pos):
             if self.ai_depth < self.depth:
                 self.ai_depth += 1
                 self.controller.max_depth = self.ai_depth
             return
 
+        if self.ai_thinking:
+            return
+
         if self._btn_toss and self._btn_toss.collidepoint(mouse_pos):
-            if self.current_roll is None and not self.ai_thinking:
+            if self.current_roll is None:
                     self._roll_and_compute_moves()
             return
 
         if self._btn_ai and self._btn_ai.collidepoint(mouse_pos):
             if self.current_roll is not None:
-                self.state, best_action = self.controller.execute_turn(self.state, self.current_roll)
-                if best_action:
-                    self.last_move_from = best_action[0]
-                    self.last_move_to = best_action[1]
-                
-                self.current_roll = None
-                self.legal_moves = {}
-                if self.state.is_terminal():
-                    self.winner = self.state.get_winner()
+                self._start_search(self.current_roll)
             return
 
         if self._btn_skip and self._btn_skip.collidepoint(mouse_pos):
@@ -177,47 +278,90 @@ class DisplayBoard:
             return
         
         if self.game_mode == "human_vs_expectiminimax" and self.state.current_player == self.ai_player:
-            pygame.time.wait(300)
-            
-            self.ai_roll = self.prob.throw_sticks()
-            if self.screen and self.font and self.big_font:
-                self._draw(self.screen, self.font)
-                pygame.display.flip()
-            
-            self.ai_thinking = True
-            if self.screen and self.font and self.big_font:
-                self._draw(self.screen, self.font)
-                pygame.display.flip()
-            
-            self.state, best_action = self.controller.execute_turn(self.state, self.ai_roll)
-            if best_action:
-                self.last_move_from = best_action[0]
-                self.last_move_to = best_action[1]
-            
-            self.ai_roll = None
-            self.ai_thinking = False
-            
-            if self.state.is_terminal():
-                self.winner = self.state.get_winner()
+            self._start_search(self.prob.throw_sticks())
+
+    def _load_fonts(self) -> None:
+        self._label_font = pygame.font.SysFont("arial", 22, bold=True)
+        self._small_font = pygame.font.SysFont("arial", 16)
+        self._mode_font = pygame.font.SysFont("arial", 16, bold=True)
+        self._depth_font = pygame.font.SysFont("arial", 14)
+        self._thinking_font = pygame.font.SysFont("arial", 20, bold=True)
+        self._roll_font = pygame.font.SysFont("arial", 42, bold=True)
+
+    def _text(self, font: pygame.font.Font, text: str, color: tuple[int, int, int]) -> pygame.Surface:
+        # Rendered labels keyed by content. Changing texts such as the node
+        # counter would grow this without bound, so it is dropped when full.
+        key = (font, text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) >= TEXT_CACHE_SIZE:
+                self._text_cache.clear()
+            surface = font.render(text, True, color)
+            self._text_cache[key] = surface
+        return surface
+
+    def _board_layer(self, screen: pygame.Surface) -> pygame.Surface:
+        # Background, frame, squares and house icons never change, so they are
+        # drawn once and blitted as the base of every frame.
+        if self._static_layer is not None and self._static_layer.get_size() == screen.get_size():
+            return self._static_layer
+
+        layer = pygame.Surface(screen.get_size())
+        layer.fill((250, 248, 245))
+        board_w = self.config.cols * self.config.cell_size
+        board_x = (screen.get_width() - board_w) // 2
+        board_y = self.config.margin + self.config.top_bar
+        board_h = self.config.rows * self.config.cell_size
+
+        frame = pygame.Rect(board_x - 18, board_y - 18, board_w + 36, board_h + 36)
+        pygame.draw.rect(layer, (120, 120, 120), frame, border_radius=18)
+
+        light = (246, 247, 226)
+        tan = (221, 186, 132)
+        houses = {
+            HOUSE_OF_REBIRTH,
+            HOUSE_OF_HAPPINESS,
+            HOUSE_OF_WATER,
+            HOUSE_OF_THREE_TRUTHS,
+            HOUSE_OF_RE_ATOUM,
+            HOUSE_OF_HORUS,
+        }
+        self._square_rects = []
+        for row in range(self.config.rows):
+            for col in range(self.config.cols):
+                idx = rc_to_idx(row, col, self.config.cols)
+
+                x = board_x + col * self.config.cell_size
+                y = board_y + row * self.config.cell_size
+                rect = pygame.Rect(x, y, self.config.cell_size - 10, self.config.cell_size - 10)
+                rect.center = (x + self.config.cell_size // 2, y + self.config.cell_size // 2)
+
+                bg = light if (row + col) % 2 == 0 else tan
+                pygame.draw.rect(layer, bg, rect, border_radius=12)
+                pygame.draw.rect(layer, (30, 30, 30), rect, width=1, border_radius=12)
+                if idx in houses:
+                    self._draw_special_icon(layer, rect, idx)
+                self._square_rects.append((idx, rect))
+
+        self._static_layer = layer
+        return layer
 
     def _draw_button(self, screen: pygame.Surface, rect: pygame.Rect, text: str, font: pygame.font.Font) -> None:
         pygame.draw.rect(screen, (230, 230, 230), rect, border_radius=1)
         pygame.draw.rect(screen, (170, 170, 170), rect, width=1, border_radius=1)
-        label = font.render(text, True, (20, 20, 20))
+        label = self._text(font, text, (20, 20, 20))
         screen.blit(label, label.get_rect(center=rect.center))
 
     def _draw_sticks_area(self, screen: pygame.Surface, rect: pygame.Rect, roll_value: int | None) -> None:
         pygame.draw.rect(screen, (255, 255, 255), rect, border_radius=12)
         pygame.draw.rect(screen, (120, 120, 120), rect, width=3, border_radius=12)
 
-        roll_font = pygame.font.SysFont("arial", 42, bold=True)
-        
         if roll_value is None:
-            no_roll = roll_font.render("?", True, (180, 180, 180))
+            no_roll = self._text(self._roll_font, "?", (180, 180, 180))
             screen.blit(no_roll, no_roll.get_rect(center=rect.center))
             return
 
-        roll_text = roll_font.render(str(roll_value), True, (40, 40, 40))
+        roll_text = self._text(self._roll_font, str(roll_value), (40, 40, 40))
         screen.blit(roll_text, roll_text.get_rect(center=rect.center))
 
     def _draw_special_icon(self, screen: pygame.Surface, rect: pygame.Rect, sq_num: int) -> None:
@@ -265,13 +409,14 @@ class DisplayBoard:
                 pygame.draw.arc(screen, color, (x - 10, cy - 6, 20, 18), 0, 3.14, 2)
 
     def _draw(self, screen: pygame.Surface, big: pygame.font.Font) -> None:
-        screen.fill((250, 248, 245))
+        if self._label_font is None:
+            self._load_fonts()
+        screen.blit(self._board_layer(screen), (0, 0))
         m = self.config.margin
 
-        label_font = pygame.font.SysFont("arial", 22, bold=True)
-        small = pygame.font.SysFont("arial", 16)
+        label_font = self._label_font
+        small = self._small_font
 
-        board_w = self.config.cols * self.config.cell_size
         screen_w = screen.get_width()
         board_center_x = screen_w // 2
 
@@ -280,7 +425,7 @@ class DisplayBoard:
         
         pygame.draw.rect(screen, (255, 255, 255), black_box, border_radius=10)
         pygame.draw.rect(screen, (80, 95, 110), black_box, width=3, border_radius=10)
-        b_label = label_font.render(f"Black: {self.state.black_goal_count}", True, (20, 20, 20))
+        b_label = self._text(label_font, f"Black: {self.state.black_goal_count}", (20, 20, 20))
         screen.blit(b_label, (black_box.x + 12, black_box.y + 15))
 
         mode_text = "Human vs AI" if self.game_mode == "human_vs_expectiminimax" else "Human vs Human"
@@ -289,14 +434,14 @@ class DisplayBoard:
         mode_color = (150, 150, 150)
         pygame.draw.rect(screen, mode_color, self._btn_mode, border_radius=8)
         pygame.draw.rect(screen, (60, 60, 60), self._btn_mode, width=1, border_radius=8)
-        mode_label = pygame.font.SysFont("arial", 16, bold=True).render(mode_text, True, (255, 255, 255))
+        mode_label = self._text(self._mode_font, mode_text, (255, 255, 255))
         screen.blit(mode_label, mode_label.get_rect(center=self._btn_mode.center))
 
-        if self.game_mode == "human_vs_expectiminimax":
+        if self.game_mode == "human_vs_expectiminimax" and self._depth_limited:
             depth_y = m + 125
             depth_x = m + 30
             
-            depth_label = pygame.font.SysFont("arial", 14).render("AI Depth:", True, (60, 60, 60))
+            depth_label = self._text(self._depth_font, "AI Depth:", (60, 60, 60))
             screen.blit(depth_label, (depth_x, depth_y))
             
             self._btn_depth_minus = pygame.Rect(depth_x, depth_y + 22, 35, 30)
@@ -305,22 +450,22 @@ class DisplayBoard:
             
             pygame.draw.rect(screen, (230, 230, 230), self._btn_depth_minus, border_radius=1)
             pygame.draw.rect(screen, (170, 170, 170), self._btn_depth_minus, width=1, border_radius=1)
-            minus_label = label_font.render("-", True, (20, 20, 20))
+            minus_label = self._text(label_font, "-", (20, 20, 20))
             screen.blit(minus_label, minus_label.get_rect(center=self._btn_depth_minus.center))
             
             pygame.draw.rect(screen, (255, 255, 255), self._depth_display, border_radius=1)
             pygame.draw.rect(screen, (120, 120, 120), self._depth_display, width=1, border_radius=1)
-            depth_num = label_font.render(str(self.ai_depth), True, (20, 20, 20))
+            depth_num = self._text(label_font, str(self.ai_depth), (20, 20, 20))
             screen.blit(depth_num, depth_num.get_rect(center=self._depth_display.center))
             
             pygame.draw.rect(screen, (230, 230, 230), self._btn_depth_plus, border_radius=1)
             pygame.draw.rect(screen, (170, 170, 170), self._btn_depth_plus, width=1, border_radius=1)
-            plus_label = label_font.render("+", True, (20, 20, 20))
+            plus_label = self._text(label_font, "+", (20, 20, 20))
             screen.blit(plus_label, plus_label.get_rect(center=self._btn_depth_plus.center))
 
         pygame.draw.rect(screen, (255, 255, 255), white_box, border_radius=10)
         pygame.draw.rect(screen, (120, 120, 120), white_box, width=3, border_radius=10)
-        w_label = label_font.render(f"White: {self.state.white_goal_count}", True, (20, 20, 20))
+        w_label = self._text(label_font, f"White: {self.state.white_goal_count}", (20, 20, 20))
         screen.blit(w_label, (white_box.x + 12, white_box.y + 15))
 
         sticks_w, sticks_h = 100, 80
@@ -333,7 +478,7 @@ class DisplayBoard:
         else:
             self._draw_sticks_area(screen, self._sticks_rect, self.current_roll)
 
-        title = big.render("Senet Game", True, (40, 40, 40))
+        title = self._text(big, "Senet Game", (40, 40, 40))
         screen.blit(title, title.get_rect(center=(board_center_x, m + 42)))
 
         turn_color = (80, 95, 110) if self.state.current_player == Player.BLACK else (255, 255, 255)
@@ -344,11 +489,11 @@ class DisplayBoard:
         turn_text_color = (255, 255, 255) if self.state.current_player == Player.BLACK else (20, 20, 20)
         
         if self.ai_thinking:
-            turn_text = pygame.font.SysFont("arial", 20, bold=True).render("Thinking...", True, turn_text_color)
+            turn_text = self._text(self._thinking_font, "Thinking...", turn_text_color)
         elif self.game_mode == "human_vs_expectiminimax" and self.state.current_player == self.ai_player:
-            turn_text = label_font.render(f"{self.state.current_player.name}'s Turn (AI)", True, turn_text_color)
+            turn_text = self._text(label_font, f"{self.state.current_player.name}'s Turn (AI)", turn_text_color)
         else:
-            turn_text = label_font.render(f"{self.state.current_player.name}'s Turn", True, turn_text_color)
+            turn_text = self._text(label_font, f"{self.state.current_player.name}'s Turn", turn_text_color)
         screen.blit(turn_text, turn_text.get_rect(center=turn_bg.center))
 
         btn_w, btn_h = 110, 32
@@ -363,98 +508,133 @@ class DisplayBoard:
         else:
             pygame.draw.rect(screen, (200, 200, 200), self._btn_ai)
             pygame.draw.rect(screen, (150, 150, 150), self._btn_ai, width=2)
-            label = small.render("AI Move", True, (140, 140, 140))
+            label = self._text(small, "AI Move", (140, 140, 140))
             screen.blit(label, label.get_rect(center=self._btn_ai.center))
         
         self._draw_button(screen, self._btn_skip, "Skip Turn", small)
 
         board_y = m + self.config.top_bar
-        board_x = (screen_w - board_w) // 2
         board_h = self.config.rows * self.config.cell_size
 
-        frame = pygame.Rect(board_x - 18, board_y - 18, board_w + 36, board_h + 36)
-        pygame.draw.rect(screen, (120, 120, 120), frame, border_radius=18)
+        board = self.state.board
+        hover_target = self.legal_moves.get(self.hover_idx)
+        for idx, rect in self._square_rects:
+            if idx in self.legal_moves:
+                pygame.draw.rect(screen, (40, 160, 90), rect, width=4, border_radius=12)
+            
+            if self.last_move_from is not None and idx == self.last_move_from:
+                pygame.draw.rect(screen, (60, 200, 110), rect, width=5, border_radius=12)
+            
+            if self.last_move_to is not None and idx == self.last_move_to:
+                pygame.draw.rect(screen, (60, 200, 110), rect, width=5, border_radius=12)
 
-        light = (246, 247, 226)
-        tan = (221, 186, 132)
+            if idx == hover_target:
+                pygame.draw.rect(screen, (40, 160, 90), rect, width=2, border_radius=12)
 
-        for row in range(self.config.rows):
-            for col in range(self.config.cols):
-                idx = rc_to_idx(row, col, self.config.cols)
+            piece = board[idx]
+            if piece is None or piece == Player.EMPTY.value:
+                continue
 
-                x = board_x + col * self.config.cell_size
-                y = board_y + row * self.config.cell_size
-                rect = pygame.Rect(x, y, self.config.cell_size - 10, self.config.cell_size - 10)
-                rect.center = (x + self.config.cell_size // 2, y + self.config.cell_size // 2)
+            is_white = (piece == Player.WHITE.value)
 
-                bg = light if (row + col) % 2 == 0 else tan
-                pygame.draw.rect(screen, bg, rect, border_radius=12)
-                pygame.draw.rect(screen, (30, 30, 30), rect, width=1, border_radius=12)
-
-                if idx in self.legal_moves:
-                    pygame.draw.rect(screen, (40, 160, 90), rect, width=4, border_radius=12)
-                
-                if self.last_move_from is not None and idx == self.last_move_from:
-                    pygame.draw.rect(screen, (60, 200, 110), rect, width=5, border_radius=12)
-                
-                if self.last_move_to is not None and idx == self.last_move_to:
-                    pygame.draw.rect(screen, (60, 200, 110), rect, width=5, border_radius=12)
-
-                sq_num = idx 
-                if sq_num in {
-                    HOUSE_OF_REBIRTH,
-                    HOUSE_OF_HAPPINESS,
-                    HOUSE_OF_WATER,
-                    HOUSE_OF_THREE_TRUTHS,
-                    HOUSE_OF_RE_ATOUM,
-                    HOUSE_OF_HORUS,
-                }:
-                    self._draw_special_icon(screen, rect, sq_num)
-
-                piece = self.state.board[idx]
-                if piece is None or piece == Player.EMPTY.value:
-                    continue
-
-                is_white = (piece == Player.WHITE.value)
-
-                color = (255, 255, 255) if is_white else (80, 95, 110)
-                center = rect.center
-                radius = rect.width // 3
-                pygame.draw.circle(screen, color, center, radius)
-                pygame.draw.circle(screen, (30, 30, 30), center, radius, width=1)
+            color = (255, 255, 255) if is_white else (80, 95, 110)
+            center = rect.center
+            radius = rect.width // 3
+            pygame.draw.circle(screen, color, center, radius)
+            pygame.draw.circle(screen, (30, 30, 30), center, radius, width=1)
 
         if self.winner is not None:
             win_bg = pygame.Rect(0, 0, 450, 70)
             win_bg.center = (board_center_x, board_y + board_h + 50)
             pygame.draw.rect(screen, (80, 180, 80), win_bg, border_radius=15)
             pygame.draw.rect(screen, (50, 120, 50), win_bg, width=4, border_radius=15)
-            win = big.render(f"Winner: {self.winner.name}!", True, (255, 255, 255))
+            win = self._text(big, f"Winner: {self.winner.name}!", (255, 255, 255))
             screen.blit(win, win.get_rect(center=win_bg.center))
         else:
             hint_y = board_y + board_h + 40
-            if self.current_roll is None:
-                hint = small.render("Press 'Throw Sticks' or SPACE to roll the sticks", True, (80, 80, 80))
+            if self.ai_thinking:
+                # Changes every frame, so it is not worth caching.
+                depth = f"{self.controller.completed_depth}"
+                if self._depth_limited:
+                    depth += f"/{self.controller.max_depth}"
+                hint = small.render(
+                    f"AI thinking: depth {depth}, {self.controller.nodes_explored:,} nodes, "
+                    f"{time.time() - self._search_started:.1f}s",
+                    True, (80, 80, 80))
+            elif self.current_roll is None:
+                hint = self._text(small, "Press 'Throw Sticks' or SPACE to roll the sticks", (80, 80, 80))
             else:
-                hint = small.render(f"Roll: {self.current_roll} - Click a green highlighted piece to move", True, (30, 120, 60))
+                hint = self._text(small, f"Roll: {self.current_roll} - Click a green highlighted piece to move", (30, 120, 60))
             hint_rect = hint.get_rect(center=(board_center_x, hint_y))
             screen.blit(hint, hint_rect)
 
+    def _cell_view(self) -> list[tuple]:
+        board = self.state.board
+        hover_target = self.legal_moves.get(self.hover_idx)
+        return [
+            (board[idx], idx in self.legal_moves, idx == self.last_move_from, idx == self.last_move_to,
+             idx == hover_target)
+            for idx, _ in self._square_rects
+        ]
+
+    def _panel_view(self) -> tuple:
+        return (
+            self.state.white_goal_count, self.state.black_goal_count, self.state.current_player,
+            self.game_mode, self.ai_depth, self.current_roll, self.ai_roll, self.ai_thinking, self.winner,
+        )
+
+    def _render(self, screen: pygame.Surface, big: pygame.font.Font) -> list[pygame.Rect] | None:
+        # Draws the frame if anything visible changed and returns the areas to
+        # present: None for the whole window, an empty list when nothing changed.
+        if self._needs_redraw or not self._square_rects:
+            self._draw(screen, big)
+            self._needs_redraw = False
+            self._shown_cells = self._cell_view()
+            self._shown_panel = self._panel_view()
+            return None
+
+        cells = self._cell_view()
+        panel = self._panel_view()
+        dirty = [rect for (_, rect), old, new in zip(self._square_rects, self._shown_cells, cells) if old != new]
+        board_top = self.config.margin + self.config.top_bar - 18
+        board_bottom = board_top + self.config.rows * self.config.cell_size + 36
+        if panel != self._shown_panel:
+            dirty.append(pygame.Rect(0, 0, screen.get_width(), board_top))
+        if panel != self._shown_panel or self.ai_thinking:
+            dirty.append(pygame.Rect(0, board_bottom, screen.get_width(), screen.get_height() - board_bottom))
+        if dirty:
+            self._draw(screen, big)
+            self._shown_cells = cells
+            self._shown_panel = panel
+        return dirty
+
     def run(self) -> None:
         pygame.init()
+        # The search thread holds the GIL between switches; a shorter interval
+        # lets the event loop get it back within a frame.
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(UI_SWITCH_INTERVAL)
         try:
             board_w = self.config.cols * self.config.cell_size
             width = self.config.margin * 2 + board_w
             height = self.config.margin * 2 + self.config.top_bar + self.config.rows * self.config.cell_size + 80
             self.screen = pygame.display.set_mode((width, height))
             pygame.display.set_caption("Senet Game")
-            clock = pygame.time.Clock()
+            self._needs_redraw = True
 
             self.font = pygame.font.SysFont("consolas", 22)
             self.big_font = pygame.font.SysFont("timesnewroman", 34, bold=True)
 
             running = True
             while running:
-                for event in pygame.event.get():
+                first = pygame.event.wait(FRAME_MS if self.ai_thinking else IDLE_WAIT_MS)
+                for event in [first] + pygame.event.get():
+                    if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                        self._needs_redraw = True
+
+                    if event.type == pygame.MOUSEMOTION:
+                        self.hover_idx = self._mouse_to_index(event.pos)
+
                     if event.type == pygame.QUIT:
                         running = False
 
@@ -464,38 +644,24 @@ class DisplayBoard:
                         if event.key == pygame.K_SPACE:
                             if self.winner is None and self.current_roll is None and not self.ai_thinking:
                                 if self.game_mode == "human_vs_expectiminimax" and self.state.current_player == self.ai_player:
-                                    self.ai_roll = self.prob.throw_sticks()
-                                    
-                                    self.last_move_from = None
-                                    self.last_move_to = None
-                                    
-                                    self._draw(self.screen, self.font)
-                                    pygame.display.flip()
-                                    
-                                    self.ai_thinking = True
-                                    self._draw(self.screen, self.font)
-                                    pygame.display.flip()
-                                    
-                                    self.state, best_action = self.controller.execute_turn(self.state, self.ai_roll)
-                                    if best_action:
-                                        self.last_move_from = best_action[0]
-                                        self.last_move_to = best_action[1]
-                                    
-                                    self.ai_roll = None
-                                    self.ai_thinking = False
-                                    
-                                    if self.state.is_terminal():
-                                        self.winner = self.state.get_winner()
+                                    self._start_ai_turn()
                                 else:
                                     self._roll_and_compute_moves()
 
                     if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                         self._handle_click(event.pos)
 
-                self._draw(self.screen, self.font)
-                pygame.display.flip()
-                clock.tick(60)
+                self._poll_search()
+                dirty = self._render(self.screen, self.font)
+                if dirty is None:
+                    pygame.display.flip()
+                elif dirty:
+                    pygame.display.update(dirty)
         finally:
+            self._cancel_search()
+            self._stop_pondering()
+            self._executor.shutdown(wait=True)
+            sys.setswitchinterval(switch_interval)
             pygame.quit()
 
 